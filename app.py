@@ -4,6 +4,11 @@ app = create_app()
 
 
 if __name__ == "__main__":
+    # The development server migrates on start; deployments run `flask db-upgrade`.
+    from bluehire import db, migrations
+
+    with app.app_context():
+        migrations.upgrade(db.engine)
     app.run(debug=True)
 
 
@@ -0,0 +1,132 @@
+"""Concurrent write throughput on SQLite, default engine vs tuned profile.
+
+Starts several writer processes (like gunicorn workers) inserting jobs and
+applications through the ORM, plus reader processes paging the job list,
+against the same database file. Runs once with ``SQLITE_TUNING=False`` and
+once with the tuned engine profile, and reports commits/sec, failed
+("database is locked") commits and reads/sec for each.
+
+Usage::
+
+    python benchmarks/concurrency_bench.py --writers 4 --readers 4 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from bluehire import create_app, db  # noqa: E402
+from bluehire.models import Application, EmployerProfile, Job, User, WorkerProfile  # noqa: E402
+
+
+def _config(path, tuned):
+    return {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}", "SQLITE_TUNING": tuned}
+
+
+def prepare(path, tuned, workers):
+    # Only here: the writer and reader processes start on the migrated file.
+    app = create_app({**_config(path, tuned), "AUTO_MIGRATE": True})
+    with app.app_context():
+        user = User(name="Bench Employer", email="bench@bluehire.test", role="employer", password_hash="x")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(EmployerProfile(user_id=user.id, company_name="Bench Employer"))
+        for i in range(workers):
+            worker = User(name=f"Bench Worker {i}", email=f"w{i}@bluehire.test", role="worker", password_hash="x")
+            db.session.add(worker)
+            db.session.flush()
+            db.session.add(WorkerProfile(user_id=worker.id, skills="Electrician"))
+        db.session.commit()
+
+
+def writer(path, tuned, seconds, index, results):
+    app = create_app(_config(path, tuned))
+    ok = failed = 0
+    with app.app_context():
+        employer_id = EmployerProfile.query.first().id
+        worker_id = WorkerProfile.query.order_by(WorkerProfile.id).offset(index).first().id
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            try:
+                job = Job(
+                    title="Bench Job",
+                    description="Benchmark",
+                    category="Electrician",
+                    location="Bengaluru",
+                    skills_required="Electrician, Wiring",
+                    employer_id=employer_id,
+                )
+                db.session.add(job)
+                db.session.flush()
+                db.session.add(Application(worker_id=worker_id, job_id=job.id))
+                db.session.commit()
+                ok += 1
+            except OperationalError:
+                db.session.rollback()
+                failed += 1
+    results.put(("write", ok, failed))
+
+
+def reader(path, tuned, seconds, results):
+    app = create_app(_config(path, tuned))
+    ok = failed = 0
+    with app.app_context():
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            try:
+                Job.query.order_by(Job.created_at.desc(), Job.id.desc()).limit(20).all()
+                db.session.rollback()
+                ok += 1
+            except OperationalError:
+                db.session.rollback()
+                failed += 1
+    results.put(("read", ok, failed))
+
+
+def run(tuned, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        prepare(path, tuned, args.writers)
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=writer, args=(path, tuned, args.seconds, i, results))
+            for i in range(args.writers)
+        ] + [
+            multiprocessing.Process(target=reader, args=(path, tuned, args.seconds, results))
+            for _ in range(args.readers)
+        ]
+        for proc in procs:
+            proc.start()
+        totals = {"write": [0, 0], "read": [0, 0]}
+        for _ in procs:
+            kind, ok, failed = results.get()
+            totals[kind][0] += ok
+            totals[kind][1] += failed
+        for proc in procs:
+            proc.join()
+    label = "tuned" if tuned else "default"
+    print(
+        f"{label:>8}: {totals['write'][0] / args.seconds:8.1f} commits/s "
+        f"({totals['write'][1]} locked)  {totals['read'][0] / args.seconds:8.1f} reads/s "
+        f"({totals['read'][1]} locked)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    for tuned in (False, True):
+        run(tuned, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Time top-K job recommendations and candidate suggestions.
+
+Builds a MatchIndex directly from synthetic jobs and workers (no database)
+and reports per-query latency.
+
+Usage::
+
+    python benchmarks/matching_bench.py --jobs 500000 --workers 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bluehire import CITIES, SKILLS_SETS  # noqa: E402
+from bluehire.matching import MatchIndex  # noqa: E402
+
+SKILL_POOL = sorted({skill.strip() for skills in SKILLS_SETS for skill in skills.split(",")})
+
+
+def synthetic_skills(rng):
+    skills = [skill.strip() for skill in rng.choice(SKILLS_SETS).split(",")]
+    if rng.random() < 0.5:
+        skills.pop(rng.randrange(len(skills)))
+    if rng.random() < 0.5:
+        skills.append(rng.choice(SKILL_POOL))
+    return ", ".join(skills)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        "p99_ms": samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = MatchIndex()
+    start = time.perf_counter()
+    for job_id in range(1, args.jobs + 1):
+        skills = synthetic_skills(rng)
+        index.add_job(job_id, skills, skills.split(",")[0], rng.choice(CITIES))
+    for worker_id in range(1, args.workers + 1):
+        index.add_worker(worker_id, synthetic_skills(rng), rng.choice(CITIES), rng.randint(0, 15))
+    print(
+        f"indexed {args.jobs} jobs ({len(index.jobs.groups)} skill profiles) and "
+        f"{args.workers} workers ({len(index.workers.groups)} skill profiles) in {time.perf_counter() - start:.1f}s"
+    )
+
+    for name, query in (
+        ("top_jobs", lambda: index.top_jobs(synthetic_skills(rng), rng.choice(CITIES), args.k)),
+        (
+            "top_workers",
+            lambda: index.top_workers(synthetic_skills(rng), rng.choice(SKILL_POOL), rng.choice(CITIES), args.k),
+        ),
+    ):
+        samples = []
+        for _ in range(args.queries):
+            start = time.perf_counter()
+            query()
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"{name:>11}: " + "  ".join(f"{k}={v:.3f}" for k, v in percentiles(samples).items()))
+
+
+if __name__ == "__main__":
+    main()
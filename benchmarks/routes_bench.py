@@ -0,0 +1,261 @@
+"""End-to-end latency, query count and memory for the hot routes.
+
+Builds the app with ``create_app`` on a temporary SQLite database filled by
+``bluehire.loadgen``, logs in one worker, one employer and one admin, and
+drives each route in-process through the Flask test client. For every route
+it reports p50/p95/p99 latency, SQL statements per request and the peak
+memory allocated while serving a request.
+
+Results can be written as JSON and compared with a stored baseline; the
+script exits non-zero if any route's p95 or query count regressed.
+
+Usage::
+
+    python benchmarks/routes_bench.py --workers 20000 --jobs 50000 --output results.json
+    python benchmarks/routes_bench.py --baseline benchmarks/routes_baseline.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import url_for  # noqa: E402
+from sqlalchemy import event, func  # noqa: E402
+
+from bluehire import create_app, db, loadgen, otp, passwords  # noqa: E402
+from bluehire.models import Application, Job, User, WorkerProfile  # noqa: E402
+
+SEARCHES = [{}, {"q": "electrician"}, {"location": "Delhi"}, {"q": "plumb", "location": "Mumbai"}]
+# p95 changes smaller than this are noise, whatever the percentage.
+MIN_LATENCY_DELTA_MS = 1.0
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        "p99_ms": samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._before)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def login(app, email):
+    client = app.test_client()
+    response = client.post("/login", data={"email": email, "password": loadgen.PASSWORD})
+    assert response.status_code == 302, f"login failed for {email}"
+    return client
+
+
+def build_cases(app):
+    """Return ``{endpoint: (client, prepare)}``; ``prepare()`` yields request kwargs."""
+    with passwords.fast_mode():
+        admin = User(name="Bench Admin", email="admin@bluehire.test", role="admin")
+        admin.set_password(loadgen.PASSWORD)
+    db.session.add(admin)
+    db.session.commit()
+
+    worker_email, worker_phone = db.session.execute(
+        db.select(User.email, User.phone)
+        .select_from(WorkerProfile)
+        .join(User, WorkerProfile.user_id == User.id)
+        .join(Application, Application.worker_id == WorkerProfile.id)
+        .group_by(WorkerProfile.id)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).one()
+    job_id, employer_email = db.session.execute(
+        db.select(Job.id, User.email)
+        .join(Application, Application.job_id == Job.id)
+        .join(Job.employer)
+        .join(User)
+        .group_by(Job.id)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).one()
+    db.session.remove()
+
+    anonymous = app.test_client()
+    worker = login(app, worker_email)
+    employer = login(app, employer_email)
+    admin = login(app, "admin@bluehire.test")
+    otp_client = app.test_client()
+
+    with app.test_request_context():
+        urls = {
+            "main.index": url_for("main.index"),
+            "worker.browse_jobs": url_for("worker.browse_jobs"),
+            "worker.dashboard": url_for("worker.dashboard"),
+            "employer.dashboard": url_for("employer.dashboard"),
+            "employer.view_applications": url_for("employer.view_applications", job_id=job_id),
+            "auth.login": url_for("auth.login"),
+            "auth.verify_otp": url_for("auth.verify_otp"),
+            "admin.dashboard": url_for("admin.dashboard"),
+        }
+
+    def get(endpoint, searches=None):
+        searches = itertools.cycle(searches or [{}])
+        return lambda: {"method": "GET", "path": urls[endpoint], "query_string": next(searches)}
+
+    def post_login():
+        data = {"email": worker_email, "password": loadgen.PASSWORD}
+        return {"method": "POST", "path": urls["auth.login"], "data": data}
+
+    def post_otp():
+        # Issuing the code is setup, not part of the measured request.
+        with app.app_context():
+            code = otp.issue(worker_phone)
+        with otp_client.session_transaction() as session:
+            session["otp_phone"] = worker_phone
+        return {"method": "POST", "path": urls["auth.verify_otp"], "data": {"code": code}}
+
+    return {
+        "main.index": (anonymous, get("main.index", SEARCHES)),
+        "worker.browse_jobs": (worker, get("worker.browse_jobs", SEARCHES)),
+        "worker.dashboard": (worker, get("worker.dashboard")),
+        "employer.dashboard": (employer, get("employer.dashboard")),
+        "employer.view_applications": (employer, get("employer.view_applications")),
+        "auth.login": (app.test_client(), post_login),
+        "auth.verify_otp": (otp_client, post_otp),
+        "admin.dashboard": (admin, get("admin.dashboard")),
+    }
+
+
+def measure(client, prepare, counter, requests, warmup, memory_samples):
+    def send(kwargs):
+        path = kwargs.pop("path")
+        start = time.perf_counter()
+        response = client.open(path, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert response.status_code < 400, f"{path} returned {response.status_code}"
+        return elapsed
+
+    for _ in range(warmup):
+        send(prepare())
+
+    samples = []
+    queries = 0
+    for _ in range(requests):
+        kwargs = prepare()
+        before = counter.count
+        samples.append(send(kwargs))
+        queries += counter.count - before
+
+    # Separate pass: tracemalloc slows every allocation down.
+    peak = 0
+    tracemalloc.start()
+    for _ in range(memory_samples):
+        kwargs = prepare()
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        send(kwargs)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    result = percentiles(samples)
+    result["queries_per_request"] = queries / requests
+    result["peak_kib"] = peak / 1024
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Print deltas against the baseline; return the regressed route names."""
+    regressions = []
+    for endpoint, current in results["routes"].items():
+        base = baseline.get("routes", {}).get(endpoint)
+        if base is None:
+            print(f"{endpoint:>28}: no baseline")
+            continue
+        delta = current["p95_ms"] - base["p95_ms"]
+        slower = delta > MIN_LATENCY_DELTA_MS and current["p95_ms"] > base["p95_ms"] * (1 + tolerance)
+        more_queries = current["queries_per_request"] > base["queries_per_request"]
+        flag = "REGRESSION" if slower or more_queries else "ok"
+        print(
+            f"{endpoint:>28}: p95 {base['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms, "
+            f"queries {base['queries_per_request']:.1f} -> {current['queries_per_request']:.1f}  {flag}"
+        )
+        if flag != "ok":
+            regressions.append(endpoint)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employers", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=50000)
+    parser.add_argument("--applications", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per route.")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--memory-samples", type=int, default=10)
+    parser.add_argument("--route", action="append", help="Only run this endpoint (repeatable).")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --output.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p95 slowdown.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(
+            {
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                "AUTO_MIGRATE": True,
+                # The benchmark issues far more OTPs per phone than a person would.
+                "OTP_MAX_REQUESTS": 1_000_000,
+                "RATELIMIT_BACKEND": "none",
+            }
+        )
+        with app.app_context():
+            loadgen.generate(
+                db.engine, args.employers, args.workers, args.jobs, args.applications, seed=args.seed
+            )
+            counter = QueryCounter(db.engine)
+            cases = build_cases(app)
+
+        results = {
+            "dataset": {
+                "employers": args.employers,
+                "workers": args.workers,
+                "jobs": args.jobs,
+                "applications": args.applications,
+                "seed": args.seed,
+            },
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "routes": {},
+        }
+        for endpoint, (client, prepare) in cases.items():
+            if args.route and endpoint not in args.route:
+                continue
+            result = measure(client, prepare, counter, args.requests, args.warmup, args.memory_samples)
+            results["routes"][endpoint] = result
+            print(f"{endpoint:>28}: " + "  ".join(f"{k}={v:.2f}" for k, v in result.items()))
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        if compare(results, baseline, args.tolerance):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
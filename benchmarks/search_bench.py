@@ -0,0 +1,70 @@
+"""Compare the search index against the old leading-wildcard ILIKE filter.
+
+Usage::
+
+    python benchmarks/search_bench.py --jobs 1000000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bluehire import CITIES, SKILLS_SETS, create_app, db, loadgen, search  # noqa: E402
+from bluehire.models import Job  # noqa: E402
+
+
+def ilike_ids(q, limit):
+    like = f"%{q}%"
+    query = Job.query.with_entities(Job.id).filter(Job.title.ilike(like) | Job.skills_required.ilike(like))
+    return [row.id for row in query.order_by(Job.created_at.desc()).limit(limit)]
+
+
+def time_queries(fn, queries, limit):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q, limit)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        "max_ms": samples[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(
+            {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}", "AUTO_MIGRATE": True}
+        )
+        with app.app_context():
+            loadgen.generate(db.engine, employers=1, workers=0, jobs=args.jobs, applications=0, seed=args.seed)
+
+            start = time.perf_counter()
+            backend = search.rebuild_index()
+            print(f"built {backend.name} index in {time.perf_counter() - start:.1f}s")
+
+            rng = random.Random(args.seed)
+            vocabulary = [word.strip() for skills in SKILLS_SETS for word in skills.split(",")] + CITIES
+            queries = [rng.choice(vocabulary) for _ in range(args.queries)]
+
+            for name, fn in (("ilike", ilike_ids), ("index", search.ranked_job_ids)):
+                stats = time_queries(fn, queries, args.limit)
+                print(f"{name:>6}: " + "  ".join(f"{k}={v:.2f}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
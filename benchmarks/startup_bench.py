@@ -0,0 +1,181 @@
+"""Worker startup time and memory, from launch to the first response.
+
+This is what decides how fast workers can be added during a traffic spike.
+Two ways of starting a worker are measured against a small migrated
+database:
+
+``cold``
+    A fresh interpreter imports ``bluehire``, calls ``create_app`` and
+    serves ``GET /``, as with ``gunicorn -w N app:app``.
+``preload``
+    The app is created once in this process, with ``PRELOAD_TEMPLATES``,
+    and each worker is forked from it to serve ``GET /``, as with
+    ``gunicorn --preload``. Not available on platforms without ``fork``.
+
+For each it reports the median and worst time per phase and the worker's
+memory after the first request: RSS, and on Linux the private part, which
+is what each extra forked worker really costs.
+
+Usage::
+
+    python benchmarks/startup_bench.py --workers 10
+    python benchmarks/startup_bench.py --auto-migrate  # migrate in create_app, as before
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# bluehire is imported inside the functions below, so that a cold worker's
+# import is part of what is timed.
+
+
+def memory_mb():
+    """``{"rss_mb": ..., "private_mb": ...}`` for this process (private on Linux only)."""
+    found = {}
+    try:
+        with open("/proc/self/smaps_rollup") as fh:
+            for line in fh:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Private_Clean", "Private_Dirty"):
+                    found[key] = int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+
+        # kB on Linux, bytes on macOS.
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"rss_mb": maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), "private_mb": None}
+    return {"rss_mb": found["Rss"], "private_mb": found["Private_Clean"] + found["Private_Dirty"]}
+
+
+def first_request(app):
+    response = app.test_client().get("/")
+    assert response.status_code == 200, response.status_code
+
+
+def cold_worker(config, launched):
+    """Run in a fresh interpreter: import, create the app, serve one request."""
+    start = time.perf_counter()
+    from bluehire import create_app
+
+    imported = time.perf_counter()
+    app = create_app(config)
+    created = time.perf_counter()
+    first_request(app)
+    served = time.perf_counter()
+    return {
+        "ready_ms": (time.time() - launched) * 1000,
+        "import_ms": (imported - start) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+        "first_request_ms": (served - created) * 1000,
+        **memory_mb(),
+    }
+
+
+def run_cold(config, workers):
+    results = []
+    for _ in range(workers):
+        launched = time.time()
+        output = subprocess.run(
+            [sys.executable, __file__, "--cold-worker", json.dumps(config), "--launched", repr(launched)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output))
+    return results
+
+
+def run_preload(config, workers):
+    from bluehire import create_app, db
+
+    app = create_app({**config, "PRELOAD_TEMPLATES": True})
+    results = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        launched = time.time()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            start = time.perf_counter()
+            with app.app_context():
+                # What a post_fork hook does; there is nothing to drop unless
+                # create_app opened connections.
+                db.engine.dispose(close=False)
+            first_request(app)
+            result = {
+                "ready_ms": (time.time() - launched) * 1000,
+                "first_request_ms": (time.perf_counter() - start) * 1000,
+                **memory_mb(),
+            }
+            with os.fdopen(write_fd, "w") as fh:
+                json.dump(result, fh)
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as fh:
+            results.append(json.load(fh))
+        os.waitpid(pid, 0)
+    return results
+
+
+def summarize(results):
+    summary = {}
+    for key in results[0]:
+        values = [result[key] for result in results if result[key] is not None]
+        if values:
+            summary[key] = {"p50": statistics.median(values), "max": max(values)}
+    return summary
+
+
+def prepare(path, args):
+    from bluehire import create_app, db, loadgen, search
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}", "AUTO_MIGRATE": True})
+    with app.app_context():
+        loadgen.generate(db.engine, args.employers, args.employers * 10, args.jobs, 0, report=lambda m: None)
+        search.rebuild_index()
+        # The preload parent must not hand pooled connections to its children.
+        db.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=10, help="Workers started per mode.")
+    parser.add_argument("--employers", type=int, default=10)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--auto-migrate", action="store_true", help="Check migrations in create_app.")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--cold-worker", help=argparse.SUPPRESS)
+    parser.add_argument("--launched", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_worker:
+        print(json.dumps(cold_worker(json.loads(args.cold_worker), args.launched)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        prepare(path, args)
+        config = {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}", "AUTO_MIGRATE": args.auto_migrate}
+        modes = {"cold": run_cold(config, args.workers)}
+        if hasattr(os, "fork"):
+            modes["preload"] = run_preload(config, args.workers)
+
+    results = {mode: summarize(samples) for mode, samples in modes.items()}
+    for mode, summary in results.items():
+        print(f"{mode} ({args.workers} workers)")
+        for key, value in summary.items():
+            print(f"  {key:<18} p50 {value['p50']:8.1f}  max {value['max']:8.1f}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"auto_migrate": args.auto_migrate, "workers": args.workers, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
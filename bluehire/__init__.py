@@ -1,19 +1,76 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from sqlalchemy.orm import configure_mappers
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-db = SQLAlchemy()
+from bluehire.replicas import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 login_manager = LoginManager()
 
+CITIES = [
+    "Bengaluru",
+    "Delhi",
+    "Mysuru",
+    "Mumbai",
+    "Chennai",
+    "Hyderabad",
+    "Pune",
+    "Kolkata",
+    "Jaipur",
+    "Ahmedabad",
+]
+
+SKILLS_SETS = [
+    "Electrician, Wiring, Maintenance",
+    "Plumber, Pipe Fitting, Sanitation",
+    "Driver, Heavy Vehicle, License",
+    "Carpenter, Furniture Making, Fitting",
+    "Welder, Fabrication, Cutting",
+    "Mason, Construction, Brick Work",
+    "Security Guard, Night Shift, Patrol",
+    "Housekeeping, Cleaning, Maintenance",
+    "Delivery Boy, Two Wheeler, Navigation",
+    "AC Technician, Cooling Systems, Repair",
+]
+
 
-def create_app():
+def create_app(test_config=None):
     app = Flask(__name__)
 
     app.config["SECRET_KEY"] = "change-this-secret-key"
     app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///bluehire.db"
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Apply pending migrations in create_app. Off by default: creating the
+    # app never touches the database, so workers start fast and can be
+    # forked from a preloaded master; run `flask db-upgrade` on deploy.
+    app.config["AUTO_MIGRATE"] = False
+    # Compile every template in create_app, for a master that forks workers
+    # (gunicorn --preload) so none of them compiles its own.
+    app.config["PRELOAD_TEMPLATES"] = False
+    # Reverse proxies in front of the app (nginx, a load balancer, ...).
+    # Their X-Forwarded-For/-Proto/-Host headers are trusted so that
+    # request.remote_addr, and with it the per-IP rate limits, is the
+    # client's address rather than the proxy's. Leave at 0 when clients
+    # connect directly, or they could spoof their address.
+    app.config["TRUSTED_PROXIES"] = 0
+    # instance/config.py, then BLUEHIRE_* environment variables
+    # (e.g. BLUEHIRE_SQLALCHEMY_DATABASE_URI, BLUEHIRE_DB_POOL_SIZE=20).
+    app.config.from_pyfile("config.py", silent=True)
+    app.config.from_prefixed_env("BLUEHIRE")
+    if test_config:
+        app.config.update(test_config)
 
+    if app.config["TRUSTED_PROXIES"]:
+        proxies = int(app.config["TRUSTED_PROXIES"])
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+
+    from bluehire import database
+    database.configure(app)
     db.init_app(app)
+    database.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
 
@@ -29,9 +86,39 @@ def create_app():
     app.register_blueprint(worker_bp, url_prefix="/worker")
     app.register_blueprint(admin_bp, url_prefix="/admin")
 
-    with app.app_context():
-        from bluehire import models  # noqa: F401
-        db.create_all()
+    if app.config["AUTO_MIGRATE"]:
+        from bluehire import migrations
+
+        with app.app_context():
+            migrations.upgrade(db.engine)
+
+    from bluehire import (  # noqa: F401
+        assets, autocomplete, instrumentation, job_import, lifecycle, listing, locations, matching, notifications,
+        otp, page_cache, pagination, ratelimit, replicas, search, stats, user_cache,
+    )
+    assets.init_app(app)
+    autocomplete.init_app(app)
+    instrumentation.init_app(app)
+    job_import.init_app(app)
+    lifecycle.init_app(app)
+    listing.init_app(app)
+    locations.init_app(app)
+    matching.init_app(app)
+    notifications.init_app(app)
+    otp.init_app(app)
+    page_cache.init_app(app)
+    pagination.init_app(app)
+    ratelimit.init_app(app)
+    replicas.init_app(app)
+    search.init_app(app)
+    user_cache.init_app(app)
+
+    # CPU-only work every worker would otherwise do on its first request;
+    # done here, forked workers inherit it.
+    configure_mappers()
+    if app.config["PRELOAD_TEMPLATES"]:
+        for name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(name)
 
     register_cli_commands(app)
 
@@ -39,47 +126,182 @@ def create_app():
 
 
 def register_cli_commands(app: Flask) -> None:
+    @app.cli.command("db-upgrade")
+    def db_upgrade_command():
+        """Apply pending schema migrations."""
+        from bluehire import migrations
+
+        applied = migrations.upgrade(db.engine)
+        print(f"Applied: {', '.join(applied)}" if applied else "Schema is up to date.")
+
+    @app.cli.command("check-query-plans")
+    def check_query_plans_command():
+        """Fail if a hot route query falls back to a full table scan or a sort."""
+        from bluehire import query_plans
+
+        failures = query_plans.check()
+        for name, plan in failures:
+            print(f"Full scan or sort in {name}:\n  " + "\n  ".join(plan))
+        if failures:
+            raise SystemExit(1)
+        print("All hot route queries use indexes.")
+
+    @app.cli.command("sweep-otps")
+    @click.option("--interval", type=int, default=0, help="Repeat every N seconds instead of running once.")
+    def sweep_otps_command(interval):
+        """Delete expired and used OTP codes in batches."""
+        import time
+        from bluehire import otp
+
+        while True:
+            print(f"Deleted {otp.sweep()} expired or used OTP codes.")
+            if not interval:
+                return
+            time.sleep(interval)
+
+    @app.cli.command("sweep-jobs")
+    @click.option("--interval", type=int, default=0, help="Repeat every N seconds instead of running once.")
+    @click.option("--backend", type=click.Choice(["table", "jsonl"]), help="Override JOB_ARCHIVE_BACKEND.")
+    def sweep_jobs_command(interval, backend):
+        """Expire jobs past their expiry date and archive old closed jobs."""
+        import time
+        from bluehire import lifecycle
+
+        while True:
+            expired, jobs, applications = lifecycle.sweep(backend)
+            print(f"Expired {expired} jobs; archived {jobs} jobs and {applications} applications.")
+            if not interval:
+                return
+            time.sleep(interval)
+
+    @app.cli.command("dispatch-notifications")
+    @click.option("--once", is_flag=True, help="Drain the outbox once and exit.")
+    def dispatch_notifications_command(once):
+        """Send queued notifications in the background."""
+        from bluehire import notifications
+
+        sent = notifications.run_dispatcher(once=once)
+        print(f"Processed {sent} queued notifications.")
+
+    @app.cli.command("reconcile-stats")
+    def reconcile_stats_command():
+        """Recompute dashboard counters from the source tables."""
+        from bluehire import stats
+
+        stats.reconcile()
+        print("Dashboard counters reconciled.")
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index_command():
+        """Drop and rebuild the job search index from the job table."""
+        from bluehire import search
+
+        backend = search.rebuild_index()
+        print(f"Search index rebuilt ({backend.name} backend).")
+
+    @app.cli.command("export-data")
+    @click.argument("kind", type=click.Choice(["applications", "jobs", "users"]))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default="csv", show_default=True)
+    @click.option("--gzip", "compress", is_flag=True, help="Gzip the output.")
+    @click.option("--employer-id", type=int, help="Only this employer's jobs or applications.")
+    @click.option("--job-id", type=int, help="Only applications to this job.")
+    @click.option("--output", "-o", type=click.File("wb"), default="-", help="Output file (default: stdout).")
+    def export_data_command(kind, fmt, compress, employer_id, job_id, output):
+        """Stream applications, jobs or users as CSV or JSON lines."""
+        from bluehire import exports
+
+        if kind == "applications":
+            statement = exports.applications_query(employer_id=employer_id, job_id=job_id)
+        elif kind == "jobs":
+            statement = exports.jobs_query(employer_id=employer_id)
+        else:
+            statement = exports.users_query()
+        written = exports.write(statement, output, fmt, compress)
+        if output.name != "<stdout>":
+            click.echo(f"Wrote {written} bytes to {output.name}.", err=True)
+
+    @app.cli.command("import-jobs")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--employer-id", type=int, required=True, help="Employer profile the jobs belong to.")
+    @click.option("--batch-size", type=int, help="Rows per transaction (default: JOB_IMPORT_BATCH_SIZE).")
+    def import_jobs_command(path, employer_id, batch_size):
+        """Bulk create or update jobs from a CSV, JSON or JSON-lines file."""
+        from bluehire import job_import
+        from bluehire.models import EmployerProfile
+
+        if db.session.get(EmployerProfile, employer_id) is None:
+            raise click.UsageError(f"No employer profile with id {employer_id}.")
+        try:
+            fmt = job_import.detect_format(path)
+            with open(path, "rb") as fh:
+                result = job_import.import_jobs(employer_id, job_import.read_rows(fh, fmt), batch_size)
+        except job_import.ImportFormatError as exc:
+            raise click.ClickException(str(exc))
+        for line, message in result.errors:
+            print(f"line {line}: {message}")
+        if result.error_count > len(result.errors):
+            print(f"... and {result.error_count - len(result.errors)} more errors")
+        print(
+            f"Created {result.created}, updated {result.updated}, unchanged {result.unchanged}, "
+            f"errors {result.error_count}."
+        )
+
+    @app.cli.command("load-cities")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False), required=False)
+    def load_cities_command(path):
+        """Load cities and aliases from a CSV (default: the bundled dataset)."""
+        from bluehire import locations
+
+        with db.engine.begin() as conn:
+            count = locations.seed(conn, locations.read_dataset(path or locations.DATASET))
+            updated = locations.backfill(conn)
+        print(f"Loaded {count} cities; resolved {updated} locations. Restart the app to use new cities.")
+
+    @app.cli.command("build-assets")
+    def build_assets_command():
+        """Minify, fingerprint and precompress the static CSS and JavaScript."""
+        from bluehire import assets
+
+        built = assets.build(app.static_folder, assets.output_dir())
+        for source, target, sizes in built:
+            compressed = ", ".join(f"{encoding} {size}" for encoding, size in sizes.items() if encoding)
+            print(f"{source} -> {target} ({sizes['']} bytes; {compressed})")
+        if built and "br" not in built[0][2]:
+            print("Install brotli to also write .br files.")
+        print("Restart the app to serve the new build.")
+
+    @app.cli.command("sync-replicas")
+    def sync_replicas_command():
+        """Copy the primary SQLite database over each SQLite replica (for local testing)."""
+        from bluehire import database, replicas
+
+        for key, engine in db.engines.items():
+            if key is None or not key.startswith(database.REPLICA_BIND_PREFIX):
+                continue
+            if engine.dialect.name != "sqlite" or db.engine.dialect.name != "sqlite":
+                print(f"{key}: not SQLite, skipped.")
+                continue
+            replicas.sync_sqlite(db.engine, engine)
+            print(f"{key}: copied to {engine.url.database}")
+
     @app.cli.command("seed-db")
     def seed_db_command():
         """Insert dummy data for development."""
         from bluehire.models import User, EmployerProfile, WorkerProfile, Job
-
-        cities = [
-            "Bengaluru",
-            "Delhi",
-            "Mysuru",
-            "Mumbai",
-            "Chennai",
-            "Hyderabad",
-            "Pune",
-            "Kolkata",
-            "Jaipur",
-            "Ahmedabad",
-        ]
-
-        skills_sets = [
-            "Electrician, Wiring, Maintenance",
-            "Plumber, Pipe Fitting, Sanitation",
-            "Driver, Heavy Vehicle, License",
-            "Carpenter, Furniture Making, Fitting",
-            "Welder, Fabrication, Cutting",
-            "Mason, Construction, Brick Work",
-            "Security Guard, Night Shift, Patrol",
-            "Housekeeping, Cleaning, Maintenance",
-            "Delivery Boy, Two Wheeler, Navigation",
-            "AC Technician, Cooling Systems, Repair",
-        ]
+        from bluehire.passwords import fast_mode
 
         # Only seed if no jobs exist yet
         if Job.query.first():
             print("Database already has data, skipping seed.")
             return
 
-        # Create two employers
-        emp1 = User(name="Metro Constructions", email="metro@bluehire.test", phone="9000000001", role="employer")
-        emp1.set_password("password123")
-        emp2 = User(name="City Logistics", email="logistics@bluehire.test", phone="9000000002", role="employer")
-        emp2.set_password("password123")
+        # Create two employers. Seed passwords use the fast hash; they are
+        # upgraded to the configured cost on first login.
+        with fast_mode():
+            emp1 = User(name="Metro Constructions", email="metro@bluehire.test", phone="9000000001", role="employer")
+            emp1.set_password("password123")
+            emp2 = User(name="City Logistics", email="logistics@bluehire.test", phone="9000000002", role="employer")
+            emp2.set_password("password123")
 
         db.session.add_all([emp1, emp2])
         db.session.commit()
@@ -94,19 +316,20 @@ def register_cli_commands(app: Flask) -> None:
 
         # Create a few workers
         worker_users = []
-        for i, skill in enumerate(skills_sets[:5], start=1):
+        for i, skill in enumerate(SKILLS_SETS[:5], start=1):
             u = User(
                 name=f"Worker {i}",
                 email=f"worker{i}@bluehire.test",
                 phone=f"910000000{i}",
                 role="worker",
             )
-            u.set_password("password123")
+            with fast_mode():
+                u.set_password("password123")
             db.session.add(u)
             worker_users.append((u, skill))
         db.session.commit()
 
-        for (u, skill), city in zip(worker_users, cities):
+        for (u, skill), city in zip(worker_users, CITIES):
             wprof = WorkerProfile(
                 user_id=u.id,
                 skills=skill,
@@ -117,11 +340,11 @@ def register_cli_commands(app: Flask) -> None:
 
         # Create sample jobs
         sample_jobs = [
-            ("Electrician - Residential Projects", eprof1, skills_sets[0], "Bengaluru"),
-            ("Plumber - Apartment Maintenance", eprof1, skills_sets[1], "Mysuru"),
-            ("Heavy Vehicle Driver", eprof2, skills_sets[2], "Delhi"),
-            ("Delivery Boy - E-commerce", eprof2, skills_sets[8], "Mumbai"),
-            ("Security Guard - Night Shift", eprof2, skills_sets[6], "Hyderabad"),
+            ("Electrician - Residential Projects", eprof1, SKILLS_SETS[0], "Bengaluru"),
+            ("Plumber - Apartment Maintenance", eprof1, SKILLS_SETS[1], "Mysuru"),
+            ("Heavy Vehicle Driver", eprof2, SKILLS_SETS[2], "Delhi"),
+            ("Delivery Boy - E-commerce", eprof2, SKILLS_SETS[8], "Mumbai"),
+            ("Security Guard - Night Shift", eprof2, SKILLS_SETS[6], "Hyderabad"),
         ]
 
         for title, employer_profile, skill, city in sample_jobs:
@@ -140,3 +363,24 @@ def register_cli_commands(app: Flask) -> None:
         db.session.commit()
         print("Dummy data inserted successfully.")
 
+    @app.cli.command("generate-load-data")
+    @click.option("--employers", type=int, default=1000, show_default=True)
+    @click.option("--workers", type=int, default=100000, show_default=True)
+    @click.option("--jobs", type=int, default=200000, show_default=True)
+    @click.option("--applications", type=int, default=500000, show_default=True)
+    @click.option("--seed", type=int, default=42, show_default=True, help="Same seed, same data.")
+    @click.option("--chunk", type=int, default=10000, show_default=True, help="Rows per transaction.")
+    @click.option("--days", type=int, default=365, show_default=True, help="Spread timestamps over this many days.")
+    def generate_load_data_command(employers, workers, jobs, applications, seed, chunk, days):
+        """Bulk insert synthetic users, profiles, jobs and applications."""
+        from bluehire import loadgen, page_cache, search, stats
+
+        try:
+            loadgen.generate(db.engine, employers, workers, jobs, applications, seed=seed, chunk=chunk, days=days)
+        except ValueError as exc:
+            raise click.UsageError(str(exc))
+        # Core inserts bypass the ORM events that maintain these.
+        stats.reconcile()
+        backend = search.rebuild_index()
+        page_cache.invalidate()
+        print(f"Dashboard counters reconciled; search index rebuilt ({backend.name} backend).")
@@ -1,7 +1,7 @@
-from flask import render_template, redirect, url_for, flash
+from flask import abort, jsonify, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
 
-from bluehire.models import User, Job, Application
+from bluehire import exports, instrumentation, replicas, stats, user_cache
 from . import admin_bp
 
 
@@ -19,12 +19,42 @@ def admin_required(func):
 
 
 @admin_bp.route("/dashboard")
+@replicas.read_only
 @login_required
 @admin_required
 def dashboard():
-    users = User.query.all()
-    jobs = Job.query.all()
-    applications = Application.query.all()
-    return render_template("admin_dashboard.html", users=users, jobs=jobs, applications=applications)
+    users_by_role = stats.counters("users_by_role")
+    jobs_by_category = stats.counters("jobs_by_category")
+    applications_by_status = stats.counters("applications_by_status")
+    return render_template(
+        "admin_dashboard.html",
+        total_users=sum(count for _, count in users_by_role),
+        total_jobs=sum(count for _, count in jobs_by_category),
+        total_applications=sum(count for _, count in applications_by_status),
+        users_by_role=users_by_role,
+        jobs_by_category=jobs_by_category,
+        jobs_by_city=stats.counters("jobs_by_city"),
+        applications_by_status=applications_by_status,
+        daily={metric: stats.daily_series(metric) for metric in stats.DAILY},
+        user_cache=user_cache.get_cache().info(),
+    )
+
+
+@admin_bp.route("/export/<kind>")
+@login_required
+@admin_required
+def export(kind):
+    if kind not in exports.KINDS:
+        abort(404)
+    fmt, compress = exports.request_options()
+    return exports.response(exports.QUERIES[kind](), kind, fmt, compress)
 
 
+@admin_bp.route("/metrics")
+@login_required
+@admin_required
+def metrics():
+    endpoints = instrumentation.get_metrics()
+    if endpoints is None:
+        abort(404)
+    return jsonify(endpoints)
@@ -1,11 +1,10 @@
-import random
-from datetime import datetime, timedelta
-
 from flask import render_template, redirect, url_for, flash, request, session
 from flask_login import login_user, logout_user, login_required, current_user
 
-from bluehire import db
-from bluehire.models import User, OTP, EmployerProfile, WorkerProfile
+from bluehire import db, otp, ratelimit
+from bluehire.models import User, EmployerProfile, WorkerProfile
+from bluehire.otp import OTPThrottled
+from bluehire.passwords import HashingOverloaded
 from . import auth_bp
 
 
@@ -27,7 +26,11 @@ def register():
             return render_template("register.html")
 
         user = User(name=name, email=email, phone=phone, role=role)
-        user.set_password(password)
+        try:
+            user.set_password(password)
+        except HashingOverloaded:
+            flash("The server is busy. Please try again in a moment.", "warning")
+            return render_template("register.html"), 503
         db.session.add(user)
         db.session.commit()
 
@@ -46,16 +49,24 @@ def register():
 
 
 @auth_bp.route("/login", methods=["GET", "POST"])
+@ratelimit.limit("login", account=ratelimit.form_value("email"))
 def login():
     if request.method == "POST":
         email = request.form.get("email")
         password = request.form.get("password")
 
         user = User.query.filter_by(email=email).first()
-        if not user or not user.check_password(password):
+        try:
+            valid = user is not None and user.check_password(password)
+        except HashingOverloaded:
+            flash("The server is busy. Please try again in a moment.", "warning")
+            return render_template("login.html"), 503
+        if not valid:
             flash("Invalid email or password.", "danger")
             return render_template("login.html")
 
+        # Persist a transparent re-hash, if check_password made one.
+        db.session.commit()
         login_user(user)
         flash("Logged in successfully.", "success")
 
@@ -79,6 +90,7 @@ def logout():
 
 
 @auth_bp.route("/otp/request", methods=["GET", "POST"])
+@ratelimit.limit("request_otp", account=ratelimit.form_value("phone"))
 def request_otp():
     if request.method == "POST":
         phone = request.form.get("phone")
@@ -86,10 +98,11 @@ def request_otp():
             flash("Please enter a phone number.", "danger")
             return render_template("otp_request.html")
 
-        code = f"{random.randint(100000, 999999)}"
-        otp = OTP(phone=phone, code=code)
-        db.session.add(otp)
-        db.session.commit()
+        try:
+            code = otp.issue(phone)
+        except OTPThrottled:
+            flash("Too many OTP requests. Please wait a few minutes and try again.", "warning")
+            return render_template("otp_request.html"), 429
 
         # In real system, send SMS here. For now, show on screen for demo.
         flash(f"Your OTP code is: {code} (for demo only)", "info")
@@ -100,6 +113,7 @@ def request_otp():
 
 
 @auth_bp.route("/otp/verify", methods=["GET", "POST"])
+@ratelimit.limit("verify_otp", account=ratelimit.session_value("otp_phone"))
 def verify_otp():
     phone = session.get("otp_phone")
     if not phone:
@@ -112,18 +126,10 @@ def verify_otp():
             flash("Enter the OTP code.", "danger")
             return render_template("otp_verify.html", phone=phone)
 
-        otp = (
-            OTP.query.filter_by(phone=phone, code=code, is_used=False)
-            .order_by(OTP.created_at.desc())
-            .first()
-        )
-        if not otp or datetime.utcnow() - otp.created_at > timedelta(minutes=10):
+        if not otp.verify(phone, code):
             flash("Invalid or expired OTP.", "danger")
             return render_template("otp_verify.html", phone=phone)
 
-        otp.is_used = True
-        db.session.commit()
-
         user = User.query.filter_by(phone=phone).first()
         if user:
             login_user(user)
@@ -0,0 +1,186 @@
+"""Prefix autocomplete for skills, categories and cities.
+
+Each kind has a :class:`PrefixIndex`: a sorted array of ``(key, term)``
+pairs searched with ``bisect``, where every word of a term is a key, so
+"veh" finds "Heavy Vehicle". Terms are weighted by how often they appear
+in jobs and worker profiles (the seed vocabularies and the canonical cities
+count once), and the heaviest matches are returned first.
+
+The index is loaded from the database on first use and rebuilt every
+``AUTOCOMPLETE_REBUILD_INTERVAL`` seconds by one request while the others
+keep completing from the previous index (see :mod:`bluehire.reloading`);
+in between, jobs and worker profiles committed in this process are added
+incrementally.
+"""
+import bisect
+import re
+import threading
+import time
+from collections import Counter
+from heapq import nsmallest
+
+from flask import current_app
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from bluehire import SKILLS_SETS, db, reloading
+from bluehire.models import Job, WorkerProfile
+
+DEFAULTS = {
+    "AUTOCOMPLETE_LIMIT": 8,
+    "AUTOCOMPLETE_REBUILD_INTERVAL": 3600,
+}
+
+KINDS = ("skill", "category", "city")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _clean(value):
+    return " ".join((value or "").split())
+
+
+def _skills(value):
+    return [_clean(skill) for skill in (value or "").split(",") if skill.strip()]
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._weights = Counter()
+        # Display form of each lower-cased term: the first spelling seen.
+        self._display = {}
+        self._keys = []
+
+    def add(self, term, weight=1):
+        display = _clean(term)
+        lower = display.lower()
+        if not lower:
+            return
+        if lower not in self._display:
+            self._display[lower] = display
+            for word in set(_WORD_RE.findall(lower)) | {lower}:
+                bisect.insort(self._keys, (word, lower))
+        self._weights[lower] += weight
+
+    def complete(self, prefix, limit):
+        prefix = _clean(prefix).lower()
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self._keys, (prefix,))
+        end = bisect.bisect_left(self._keys, (prefix + "\uffff",))
+        terms = {term for _, term in self._keys[start:end]}
+        best = nsmallest(limit, terms, key=lambda term: (-self._weights[term], term))
+        return [self._display[term] for term in best]
+
+    def __len__(self):
+        return len(self._display)
+
+
+class Autocomplete:
+    def __init__(self):
+        self.indexes = {kind: PrefixIndex() for kind in KINDS}
+        self.loaded_at = None
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+
+    def add_job(self, category, location, skills_required):
+        with self.lock:
+            self.indexes["category"].add(category)
+            self.indexes["city"].add(location)
+            for skill in _skills(skills_required):
+                self.indexes["skill"].add(skill)
+
+    def add_worker(self, skills, preferred_location):
+        with self.lock:
+            self.indexes["city"].add(preferred_location)
+            for skill in _skills(skills):
+                self.indexes["skill"].add(skill)
+
+    def load(self, conn):
+        indexes = {kind: PrefixIndex() for kind in KINDS}
+        for skills in SKILLS_SETS:
+            indexes["category"].add(_skills(skills)[0])
+            for skill in _skills(skills):
+                indexes["skill"].add(skill)
+
+        # Columns with few distinct values are counted by the database.
+        for kind, sql in (
+            ("city", "SELECT name, 1 FROM city"),
+            ("category", "SELECT category, COUNT(*) FROM job GROUP BY category"),
+            ("city", "SELECT location, COUNT(*) FROM job GROUP BY location"),
+            ("city", "SELECT preferred_location, COUNT(*) FROM worker_profile GROUP BY preferred_location"),
+        ):
+            for value, count in conn.execute(text(sql)):
+                indexes[kind].add(value, count)
+        # Skill lists have to be split here; group first so each distinct list is split once.
+        for sql in (
+            "SELECT skills_required, COUNT(*) FROM job GROUP BY skills_required",
+            "SELECT skills, COUNT(*) FROM worker_profile GROUP BY skills",
+        ):
+            for value, count in conn.execute(text(sql)):
+                for skill in _skills(value):
+                    indexes["skill"].add(skill, count)
+
+        with self.lock:
+            self.indexes = indexes
+            self.loaded_at = time.monotonic()
+
+    def complete(self, kind, prefix, limit):
+        with self.lock:
+            return self.indexes[kind].complete(prefix, limit)
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.extensions["autocomplete"] = Autocomplete()
+
+
+def get_index():
+    index = current_app.extensions["autocomplete"]
+    reloading.reload_if_stale(
+        index, current_app.config["AUTOCOMPLETE_REBUILD_INTERVAL"], lambda: index.load(db.session.connection())
+    )
+    return index
+
+
+def complete(kind, prefix, limit=None):
+    return get_index().complete(kind, prefix, limit or current_app.config["AUTOCOMPLETE_LIMIT"])
+
+
+def _loaded_index():
+    try:
+        index = current_app.extensions.get("autocomplete")
+    except RuntimeError:
+        return None
+    return index if index is not None and index.loaded_at is not None else None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_terms(session, flush_context):
+    # Values are copied now: after the commit the objects are expired.
+    new = [
+        (Job, (obj.category, obj.location, obj.skills_required)) if isinstance(obj, Job)
+        else (WorkerProfile, (obj.skills, obj.preferred_location))
+        for obj in session.new
+        if isinstance(obj, (Job, WorkerProfile))
+    ]
+    if new:
+        session.info.setdefault("autocomplete_new", []).extend(new)
+
+
+@event.listens_for(Session, "after_commit")
+def _add_new_terms(session):
+    new = session.info.pop("autocomplete_new", None)
+    index = _loaded_index() if new else None
+    if index is None:
+        return
+    for model, values in new:
+        if model is Job:
+            index.add_job(*values)
+        else:
+            index.add_worker(*values)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_new_terms(session):
+    session.info.pop("autocomplete_new", None)
@@ -0,0 +1,99 @@
+"""Engine configuration.
+
+:func:`configure` turns ``DB_*`` settings into ``SQLALCHEMY_ENGINE_OPTIONS``
+before Flask-SQLAlchemy creates the engine, so any SQLAlchemy URL (SQLite
+file, PostgreSQL, ...) gets a sized, recycled, pre-pinged connection pool.
+For SQLite files :func:`init_app` also sets per-connection pragmas: WAL so
+readers never block the writer, ``synchronous=NORMAL``, a ``busy_timeout``
+so concurrent writers wait instead of failing with "database is locked",
+and larger mmap and page caches. ``SQLITE_TUNING=False`` turns the pragmas
+off (the benchmark baseline).
+
+``DB_REPLICA_URIS`` adds read replicas as Flask-SQLAlchemy binds named
+``replica0``, ``replica1``, ... with the same pool settings; see
+:mod:`bluehire.replicas` for how requests are routed to them.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from bluehire import db
+
+DEFAULTS = {
+    "DB_POOL_SIZE": 10,
+    "DB_MAX_OVERFLOW": 20,
+    "DB_POOL_TIMEOUT": 30,
+    "DB_POOL_RECYCLE": 1800,
+    "DB_POOL_PRE_PING": True,
+    "DB_REPLICA_URIS": [],
+    "SQLITE_TUNING": True,
+    "SQLITE_JOURNAL_MODE": "WAL",
+    "SQLITE_SYNCHRONOUS": "NORMAL",
+    "SQLITE_BUSY_TIMEOUT_MS": 5000,
+    "SQLITE_MMAP_SIZE": 256 * 1024 * 1024,
+    # Negative values are KiB, so this is 64 MiB per connection.
+    "SQLITE_CACHE_SIZE": -64000,
+}
+
+REPLICA_BIND_PREFIX = "replica"
+
+
+def _is_sqlite_memory(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def configure(app):
+    """Fill in engine options and replica binds; call before ``db.init_app``."""
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = _engine_options(app, app.config["SQLALCHEMY_DATABASE_URI"], options)
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    for index, uri in enumerate(app.config["DB_REPLICA_URIS"]):
+        binds[f"{REPLICA_BIND_PREFIX}{index}"] = {"url": uri, **_engine_options(app, uri, {})}
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def _engine_options(app, uri, options):
+    url = make_url(uri)
+    if _is_sqlite_memory(url):
+        # Flask-SQLAlchemy uses a single static connection for these.
+        return options
+    options.setdefault("pool_size", app.config["DB_POOL_SIZE"])
+    options.setdefault("max_overflow", app.config["DB_MAX_OVERFLOW"])
+    options.setdefault("pool_timeout", app.config["DB_POOL_TIMEOUT"])
+    options.setdefault("pool_recycle", app.config["DB_POOL_RECYCLE"])
+    options.setdefault("pool_pre_ping", app.config["DB_POOL_PRE_PING"])
+    if url.get_backend_name() == "sqlite":
+        connect_args = options.setdefault("connect_args", {})
+        # Pooled connections move between request threads.
+        connect_args.setdefault("check_same_thread", False)
+        if app.config["SQLITE_TUNING"]:
+            connect_args.setdefault("timeout", app.config["SQLITE_BUSY_TIMEOUT_MS"] / 1000)
+    return options
+
+
+def init_app(app):
+    """Register SQLite pragmas on the app's engines; call after ``db.init_app``."""
+    if not app.config["SQLITE_TUNING"]:
+        return
+
+    pragmas = [
+        f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA cache_size={int(app.config['SQLITE_CACHE_SIZE'])}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", _set_pragmas)
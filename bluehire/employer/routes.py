@@ -1,7 +1,8 @@
 from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
+from sqlalchemy import case, func
 
-from bluehire import db
+from bluehire import db, exports, job_import, lifecycle, matching, replicas
 from bluehire.models import EmployerProfile, Job, Application
 from . import employer_bp
 
@@ -19,12 +20,40 @@ def employer_required(func):
     return wrapper
 
 
+def dashboard_jobs_query(employer_id):
+    """An employer's jobs with total and per-status application counts in one GROUP BY."""
+    status_counts = [
+        func.sum(case((Application.status == status, 1), else_=0)).label(status)
+        for status in Application.STATUSES
+    ]
+    return (
+        db.select(
+            Job.id,
+            Job.title,
+            Job.category,
+            Job.location,
+            Job.description,
+            Job.status,
+            Job.expires_at,
+            func.count(Application.id).label("application_count"),
+            *status_counts,
+        )
+        .outerjoin(Application, Application.job_id == Job.id)
+        .where(Job.employer_id == employer_id)
+        .group_by(Job.id)
+        .order_by(Job.created_at.desc(), Job.id.desc())
+    )
+
+
 @employer_bp.route("/dashboard")
+@replicas.read_only
 @login_required
 @employer_required
 def dashboard():
     profile = EmployerProfile.query.filter_by(user_id=current_user.id).first()
-    jobs = Job.query.filter_by(employer_id=profile.id).all() if profile else []
+    jobs = []
+    if profile:
+        jobs = db.session.execute(dashboard_jobs_query(profile.id)).all()
     return render_template("employer_dashboard.html", profile=profile, jobs=jobs)
 
 
@@ -95,6 +124,35 @@ def create_job():
     return render_template("employer_job_form.html")
 
 
+@employer_bp.route("/jobs/import", methods=["GET", "POST"])
+@login_required
+@employer_required
+def import_jobs():
+    profile = EmployerProfile.query.filter_by(user_id=current_user.id).first()
+    if not profile:
+        flash("Please complete your company profile first.", "warning")
+        return redirect(url_for("employer.profile"))
+
+    result = None
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            flash("Choose a CSV, JSON or JSON-lines file to import.", "danger")
+            return render_template("employer_job_import.html", fields=job_import.FIELDS)
+        try:
+            fmt = job_import.detect_format(upload.filename)
+            result = job_import.import_jobs(profile.id, job_import.read_rows(upload.stream, fmt))
+        except job_import.ImportFormatError as exc:
+            flash(str(exc), "danger")
+            return render_template("employer_job_import.html", fields=job_import.FIELDS), 400
+        flash(
+            f"Imported {result.created} new and {result.updated} updated jobs"
+            + (f"; {result.error_count} rows had errors." if result.error_count else "."),
+            "warning" if result.error_count else "success",
+        )
+    return render_template("employer_job_import.html", fields=job_import.FIELDS, result=result)
+
+
 @employer_bp.route("/jobs/<int:job_id>/applications")
 @login_required
 @employer_required
@@ -105,6 +163,59 @@ def view_applications(job_id):
         return redirect(url_for("employer.dashboard"))
 
     applications = Application.query.filter_by(job_id=job.id).all()
-    return render_template("employer_applications.html", job=job, applications=applications)
+    suggested = matching.suggest_workers(job, exclude={app.worker_id for app in applications})
+    return render_template(
+        "employer_applications.html", job=job, applications=applications, suggested=suggested
+    )
+
+
+@employer_bp.route("/jobs/<int:job_id>/close", methods=["POST"])
+@login_required
+@employer_required
+def close_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.employer.user_id != current_user.id:
+        flash("Access denied.", "danger")
+        return redirect(url_for("employer.dashboard"))
+    if job.status == "open":
+        lifecycle.close(job)
+        db.session.commit()
+        flash("Job closed; it no longer appears in search.", "success")
+    return redirect(url_for("employer.view_applications", job_id=job.id))
+
+
+@employer_bp.route("/jobs/<int:job_id>/reopen", methods=["POST"])
+@login_required
+@employer_required
+def reopen_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.employer.user_id != current_user.id:
+        flash("Access denied.", "danger")
+        return redirect(url_for("employer.dashboard"))
+    if job.status != "open":
+        lifecycle.reopen(job)
+        db.session.commit()
+        flash(f"Job reopened until {job.expires_at:%d %b %Y}.", "success")
+    return redirect(url_for("employer.view_applications", job_id=job.id))
 
 
+@employer_bp.route("/jobs/<int:job_id>/applications/export")
+@login_required
+@employer_required
+def export_applications(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.employer.user_id != current_user.id:
+        flash("Access denied.", "danger")
+        return redirect(url_for("employer.dashboard"))
+    fmt, compress = exports.request_options()
+    statement = exports.applications_query(job_id=job.id)
+    return exports.response(statement, f"job-{job.id}-applications", fmt, compress)
+
+
+@employer_bp.route("/jobs/export")
+@login_required
+@employer_required
+def export_jobs():
+    profile = EmployerProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    fmt, compress = exports.request_options()
+    return exports.response(exports.jobs_query(employer_id=profile.id), "jobs", fmt, compress)
@@ -0,0 +1,167 @@
+"""Streaming CSV/JSONL exports of applications, jobs and users.
+
+Rows are read with ``yield_per`` (a server-side cursor where the driver
+supports one), serialized in small batches and, optionally, gzip-compressed
+on the fly. The web endpoints hand the generator to Flask as a streaming
+response and ``flask export-data`` writes it to a file, so memory use is the
+same for a hundred rows or ten million.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+
+from flask import Response, abort, request, stream_with_context
+
+from bluehire import db
+from bluehire.models import Application, EmployerProfile, Job, User, WorkerProfile
+
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+KINDS = ("applications", "jobs", "users")
+YIELD_PER = 1000
+# Rows serialized per yielded chunk.
+CHUNK_ROWS = 500
+
+
+def applications_query(employer_id=None, job_id=None):
+    worker_user = db.aliased(User)
+    statement = (
+        db.select(
+            Application.id,
+            Application.job_id,
+            Job.title.label("job_title"),
+            EmployerProfile.company_name,
+            Application.worker_id,
+            worker_user.name.label("worker_name"),
+            worker_user.email.label("worker_email"),
+            worker_user.phone.label("worker_phone"),
+            WorkerProfile.skills,
+            WorkerProfile.experience_years,
+            WorkerProfile.preferred_location,
+            Application.status,
+            Application.applied_at,
+        )
+        .join(Job, Application.job_id == Job.id)
+        .join(EmployerProfile, Job.employer_id == EmployerProfile.id)
+        .join(WorkerProfile, Application.worker_id == WorkerProfile.id)
+        .join(worker_user, WorkerProfile.user_id == worker_user.id)
+        .order_by(Application.id)
+    )
+    if employer_id is not None:
+        statement = statement.where(Job.employer_id == employer_id)
+    if job_id is not None:
+        statement = statement.where(Application.job_id == job_id)
+    return statement
+
+
+def jobs_query(employer_id=None):
+    statement = (
+        db.select(
+            Job.id,
+            Job.title,
+            Job.category,
+            Job.location,
+            Job.skills_required,
+            Job.salary_min,
+            Job.salary_max,
+            Job.created_at,
+            Job.employer_id,
+            EmployerProfile.company_name,
+            Job.external_ref,
+            Job.status,
+            Job.expires_at,
+            Job.description,
+        )
+        .join(EmployerProfile, Job.employer_id == EmployerProfile.id)
+        .order_by(Job.id)
+    )
+    if employer_id is not None:
+        statement = statement.where(Job.employer_id == employer_id)
+    return statement
+
+
+def users_query():
+    # Never export password hashes.
+    return db.select(
+        User.id, User.name, User.email, User.phone, User.role, User.preferred_language, User.created_at
+    ).order_by(User.id)
+
+
+QUERIES = {"applications": applications_query, "jobs": jobs_query, "users": users_query}
+
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def serialize(statement, fmt):
+    """Yield the statement's rows as text chunks in ``fmt``."""
+    result = db.session.execute(statement.execution_options(yield_per=YIELD_PER))
+    columns = list(result.keys())
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        write = writer.writerow
+    else:
+        def write(row):
+            buffer.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+
+    for partition in result.partitions(CHUNK_ROWS):
+        for row in partition:
+            write([_value(value) for value in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def encode(chunks, compress=False):
+    """UTF-8 encode text chunks, gzip-compressing them as a stream if asked."""
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode()
+        return
+    # wbits=31 writes a gzip header and trailer.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def request_options():
+    """``(fmt, compress)`` from the ``format`` and ``gzip`` query arguments."""
+    fmt = request.args.get("format", "csv")
+    if fmt not in FORMATS:
+        abort(400)
+    return fmt, request.args.get("gzip", "").lower() in ("1", "true", "yes")
+
+
+def filename(name, fmt, compress=False):
+    return f"{name}.{fmt}" + (".gz" if compress else "")
+
+
+def response(statement, name, fmt, compress=False):
+    """A streaming download of ``statement`` named ``name``."""
+    mimetype = "application/gzip" if compress else FORMATS[fmt]
+    body = stream_with_context(encode(serialize(statement, fmt), compress))
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename(name, fmt, compress)}"'},
+    )
+
+
+def write(statement, fh, fmt, compress=False):
+    """Stream ``statement`` into the binary file ``fh``; returns bytes written."""
+    written = 0
+    for data in encode(serialize(statement, fmt), compress):
+        fh.write(data)
+        written += len(data)
+    return written
@@ -0,0 +1,213 @@
+"""Opt-in per-request query and timing instrumentation.
+
+With ``INSTRUMENTATION=True`` every request records its SQL statement
+count, time spent in the database, time spent rendering templates and
+total time. The numbers are sent back in a ``Server-Timing`` header (shown
+in the browser's network panel) and kept per endpoint in a rolling window
+of the last ``INSTRUMENTATION_WINDOW`` requests, which admins can read at
+``/admin/metrics``.
+
+A request that runs the same SQL statement ``INSTRUMENTATION_N_PLUS_ONE``
+times or more is flagged as a likely N+1 (typically a lazy-loaded
+relationship inside a template loop) and logged with the statement.
+
+``INSTRUMENTATION_PROFILE_RATE`` (0.0-1.0) runs that fraction of requests
+under cProfile and writes ``<endpoint>-<time>-<pid>.prof`` files to
+``INSTRUMENTATION_PROFILE_DIR`` (relative to the instance folder) for
+``snakeviz``/``pstats``.
+"""
+import bisect
+import cProfile
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from flask import before_render_template, current_app, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+from bluehire import db
+
+DEFAULTS = {
+    "INSTRUMENTATION": False,
+    "INSTRUMENTATION_WINDOW": 1000,
+    "INSTRUMENTATION_N_PLUS_ONE": 5,
+    "INSTRUMENTATION_PROFILE_RATE": 0.0,
+    "INSTRUMENTATION_PROFILE_DIR": "profiles",
+}
+
+# Upper bounds (ms) of the latency histogram buckets; the last is open-ended.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class RequestStats:
+    __slots__ = ("start", "queries", "db_ms", "template_ms", "statements", "profile", "_template_start")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.statements = Counter()
+        self.profile = None
+        self._template_start = None
+
+
+def _percentile(ordered, fraction):
+    return ordered[max(int(len(ordered) * fraction + 0.5) - 1, 0)]
+
+
+class Metrics:
+    """Rolling per-endpoint samples of ``(total_ms, db_ms, template_ms, queries)``."""
+
+    def __init__(self, window):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._n_plus_one = Counter()
+        self._last_n_plus_one = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, total_ms, db_ms, template_ms, queries, repeated=None):
+        with self._lock:
+            self._samples[endpoint].append((total_ms, db_ms, template_ms, queries))
+            if repeated:
+                self._n_plus_one[endpoint] += 1
+                self._last_n_plus_one[endpoint] = repeated
+
+    def snapshot(self):
+        with self._lock:
+            samples = {endpoint: list(window) for endpoint, window in self._samples.items()}
+            n_plus_one = dict(self._n_plus_one)
+            last = dict(self._last_n_plus_one)
+
+        endpoints = {}
+        for endpoint, rows in samples.items():
+            totals = sorted(row[0] for row in rows)
+            histogram = [0] * (len(BUCKETS_MS) + 1)
+            for total in totals:
+                histogram[bisect.bisect_left(BUCKETS_MS, total)] += 1
+            count = len(rows)
+            endpoints[endpoint] = {
+                "requests": count,
+                "p50_ms": _percentile(totals, 0.50),
+                "p95_ms": _percentile(totals, 0.95),
+                "p99_ms": _percentile(totals, 0.99),
+                "mean_db_ms": sum(row[1] for row in rows) / count,
+                "mean_template_ms": sum(row[2] for row in rows) / count,
+                "mean_queries": sum(row[3] for row in rows) / count,
+                "max_queries": max(row[3] for row in rows),
+                "histogram": dict(zip([f"le_{b}" for b in BUCKETS_MS] + ["inf"], histogram)),
+                "n_plus_one": n_plus_one.get(endpoint, 0),
+                "last_n_plus_one": last.get(endpoint),
+            }
+        return endpoints
+
+
+def _current():
+    if has_request_context():
+        return g.get("_instrumentation")
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current() is not None:
+        conn.info.setdefault("instrumentation_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current()
+    starts = conn.info.get("instrumentation_start")
+    if stats is None or not starts:
+        return
+    stats.db_ms += (time.perf_counter() - starts.pop()) * 1000
+    stats.queries += 1
+    stats.statements[statement] += 1
+
+
+def _handle_error(context):
+    starts = context.connection.info.get("instrumentation_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _before_render(sender, template, context, **extra):
+    stats = _current()
+    if stats is not None:
+        stats._template_start = time.perf_counter()
+
+
+def _rendered(sender, template, context, **extra):
+    stats = _current()
+    if stats is not None and stats._template_start is not None:
+        stats.template_ms += (time.perf_counter() - stats._template_start) * 1000
+        stats._template_start = None
+
+
+def _before_request():
+    stats = g._instrumentation = RequestStats()
+    rate = current_app.config["INSTRUMENTATION_PROFILE_RATE"]
+    if rate and random.random() < rate:
+        stats.profile = cProfile.Profile()
+        stats.profile.enable()
+
+
+def _after_request(response):
+    stats = g.pop("_instrumentation", None)
+    if stats is None:
+        return response
+    total_ms = (time.perf_counter() - stats.start) * 1000
+    endpoint = request.endpoint or "<unmatched>"
+
+    repeated = None
+    if stats.statements:
+        statement, count = stats.statements.most_common(1)[0]
+        if count >= current_app.config["INSTRUMENTATION_N_PLUS_ONE"]:
+            repeated = {"count": count, "statement": statement}
+            current_app.logger.warning(
+                "Possible N+1 in %s: statement ran %d times: %s", endpoint, count, statement
+            )
+
+    current_app.extensions["instrumentation"].record(
+        endpoint, total_ms, stats.db_ms, stats.template_ms, stats.queries, repeated
+    )
+    response.headers["Server-Timing"] = ", ".join(
+        [
+            f'db;dur={stats.db_ms:.2f};desc="{stats.queries} queries"',
+            f"tpl;dur={stats.template_ms:.2f}",
+            f"total;dur={total_ms:.2f}",
+        ]
+    )
+
+    if stats.profile is not None:
+        stats.profile.disable()
+        directory = os.path.join(current_app.instance_path, current_app.config["INSTRUMENTATION_PROFILE_DIR"])
+        os.makedirs(directory, exist_ok=True)
+        name = f"{endpoint.replace('.', '-')}-{time.time_ns()}-{os.getpid()}.prof"
+        stats.profile.dump_stats(os.path.join(directory, name))
+    return response
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    if not app.config["INSTRUMENTATION"]:
+        return
+
+    app.extensions["instrumentation"] = Metrics(app.config["INSTRUMENTATION_WINDOW"])
+    # Every bind, so queries routed to read replicas are counted too.
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+def get_metrics():
+    """Return the per-endpoint snapshot, or ``None`` when instrumentation is off."""
+    metrics = current_app.extensions.get("instrumentation")
+    return metrics.snapshot() if metrics is not None else None
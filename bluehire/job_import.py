@@ -0,0 +1,227 @@
+"""Bulk job import from CSV, JSON or JSON-lines files.
+
+Rows are read and validated one at a time and valid ones are written in
+batches of ``JOB_IMPORT_BATCH_SIZE``, one commit per batch. The per-flush
+hooks (search index, dashboard counters) and the page cache invalidation
+therefore run once per batch rather than once per row. Rows carrying an
+``external_ref`` update that employer's existing job with the same
+reference instead of creating a duplicate, so re-importing a file is safe.
+
+Invalid rows are skipped and reported with their line number; a failed
+batch is rolled back and each of its rows reported. A CSV file that turns
+out to be malformed partway through stops the import at that line, and the
+rows before it stay imported and are counted in the result.
+"""
+import codecs
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from bluehire import db
+from bluehire.models import Job
+
+DEFAULTS = {
+    "JOB_IMPORT_BATCH_SIZE": 500,
+    # Errors kept for the report; all of them are counted.
+    "JOB_IMPORT_MAX_ERRORS": 200,
+}
+
+FORMATS = ("csv", "json", "jsonl")
+REQUIRED = ("title", "description", "category", "location")
+MAX_LENGTHS = {"title": 200, "category": 100, "location": 200, "skills_required": 255, "external_ref": 100}
+FIELDS = (*REQUIRED, "skills_required", "salary_min", "salary_max", "external_ref")
+NOT_UTF8 = 'The file is not UTF-8 text; save it with UTF-8 encoding (in Excel: "CSV UTF-8") and try again.'
+
+
+class ImportFormatError(ValueError):
+    """The file could not be parsed at all."""
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, message, limit):
+        self.error_count += 1
+        if len(self.errors) < limit:
+            self.errors.append((line, message))
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+
+
+def detect_format(filename):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension not in FORMATS:
+        raise ImportFormatError(f"Unsupported file type {extension or filename!r}; use .csv, .json or .jsonl.")
+    return extension
+
+
+def _check_utf8(fh):
+    """Raise :class:`ImportFormatError` unless a seekable ``fh`` is UTF-8.
+
+    Checked up front so a spreadsheet saved as cp1252 fails before any
+    batch is written; the file is read in chunks and rewound.
+    """
+    if not fh.seekable():
+        return
+    start = fh.tell()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        while chunk := fh.read(1 << 16):
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ImportFormatError(NOT_UTF8) from None
+    finally:
+        fh.seek(start)
+
+
+def read_rows(fh, fmt):
+    """Yield ``(line, row_dict)`` from the binary file ``fh``.
+
+    A JSON line that cannot be decoded or parsed is yielded as its
+    exception and reported with that row. A CSV error is yielded as an
+    :class:`ImportFormatError` for its line, after which nothing more is
+    read. A CSV file that is not UTF-8, or a JSON file that cannot be
+    decoded or parsed, raises :class:`ImportFormatError`.
+    """
+    if fmt == "csv":
+        _check_utf8(fh)
+        reader = csv.DictReader(io.TextIOWrapper(fh, encoding="utf-8-sig", newline=""))
+        try:
+            for row in reader:
+                yield reader.line_num, row
+        except UnicodeDecodeError:
+            yield reader.line_num + 1, ImportFormatError(NOT_UTF8)
+        except csv.Error as exc:
+            yield reader.line_num + 1, ImportFormatError(f"Invalid CSV: {exc}")
+    elif fmt == "jsonl":
+        for line, raw in enumerate(fh, start=1):
+            try:
+                raw = raw.decode("utf-8-sig")
+                if not raw.strip():
+                    continue
+                row = json.loads(raw)
+            except ValueError as exc:
+                row = exc
+            yield line, row
+    else:
+        # A JSON array has to be parsed whole; use .jsonl for very large files.
+        try:
+            rows = json.load(io.TextIOWrapper(fh, encoding="utf-8-sig"))
+        except UnicodeDecodeError:
+            raise ImportFormatError(NOT_UTF8) from None
+        except ValueError as exc:
+            raise ImportFormatError(f"Invalid JSON: {exc}") from exc
+        if not isinstance(rows, list):
+            raise ImportFormatError("A .json import must be an array of objects.")
+        yield from enumerate(rows, start=1)
+
+
+def _int(value, name):
+    if value in (None, ""):
+        return None
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{name} must be a whole number") from None
+    if number < 0:
+        raise ValueError(f"{name} cannot be negative")
+    return number
+
+
+def validate(row):
+    """Return the column values for ``row``; raises ``ValueError`` if invalid."""
+    if isinstance(row, Exception):
+        raise ValueError(f"unreadable row: {row}")
+    if not isinstance(row, dict):
+        raise ValueError("expected an object with job fields")
+    values = {}
+    for name in REQUIRED + ("skills_required", "external_ref"):
+        value = row.get(name)
+        value = str(value).strip() if value is not None else ""
+        if name in REQUIRED and not value:
+            raise ValueError(f"{name} is required")
+        if len(value) > MAX_LENGTHS.get(name, len(value)):
+            raise ValueError(f"{name} is longer than {MAX_LENGTHS[name]} characters")
+        values[name] = value or None
+    values["salary_min"] = _int(row.get("salary_min"), "salary_min")
+    values["salary_max"] = _int(row.get("salary_max"), "salary_max")
+    if values["salary_min"] is not None and values["salary_max"] is not None:
+        if values["salary_min"] > values["salary_max"]:
+            raise ValueError("salary_min is greater than salary_max")
+    return values
+
+
+def _write_batch(employer_id, batch, result):
+    refs = {values["external_ref"] for _, values in batch if values["external_ref"]}
+    existing = {}
+    if refs:
+        existing = {
+            job.external_ref: job
+            for job in Job.query.filter(Job.employer_id == employer_id, Job.external_ref.in_(refs))
+        }
+    created = updated = unchanged = 0
+    for _, values in batch:
+        job = existing.get(values["external_ref"])
+        if job is None:
+            job = Job(employer_id=employer_id, **values)
+            db.session.add(job)
+            if values["external_ref"]:
+                # A later row with the same ref in this batch updates this one.
+                existing[values["external_ref"]] = job
+            created += 1
+            continue
+        for name, value in values.items():
+            setattr(job, name, value)
+        if job in db.session.new:
+            # Created earlier in this batch; already counted.
+            continue
+        if db.session.is_modified(job):
+            updated += 1
+        else:
+            unchanged += 1
+    db.session.commit()
+    result.created += created
+    result.updated += updated
+    result.unchanged += unchanged
+
+
+def import_jobs(employer_id, rows, batch_size=None):
+    """Validate and upsert ``(line, row)`` pairs for ``employer_id``."""
+    batch_size = batch_size or current_app.config["JOB_IMPORT_BATCH_SIZE"]
+    max_errors = current_app.config["JOB_IMPORT_MAX_ERRORS"]
+    result = ImportResult()
+
+    def valid_rows():
+        for line, row in rows:
+            if isinstance(row, ImportFormatError):
+                # Earlier batches are already committed, so stop here and report them.
+                result.add_error(line, f"{row}; nothing from this line on was imported.", max_errors)
+                return
+            try:
+                yield line, validate(row)
+            except ValueError as exc:
+                result.add_error(line, str(exc), max_errors)
+
+    valid = valid_rows()
+    while batch := list(islice(valid, batch_size)):
+        try:
+            _write_batch(employer_id, batch, result)
+        except SQLAlchemyError as exc:
+            db.session.rollback()
+            for line, _ in batch:
+                result.add_error(line, f"batch not saved: {exc.__class__.__name__}", max_errors)
+    return result
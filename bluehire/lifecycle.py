@@ -0,0 +1,163 @@
+"""Job lifecycle: open, closed and expired jobs, and their archival.
+
+A job is ``open`` from posting until its employer closes it or it reaches
+``expires_at`` (``JOB_TTL_DAYS`` after posting unless set explicitly), when
+the sweeper marks it ``expired``. Only open jobs are listed, searched,
+matched and accept applications; the listing indexes are partial indexes
+over open jobs, so their size follows the live inventory.
+
+``flask sweep-jobs`` expires due jobs, then moves jobs that stopped being
+open more than ``JOB_ARCHIVE_AFTER_DAYS`` ago, with their applications, out
+of the hot tables in batches of ``JOB_ARCHIVE_BATCH_SIZE``:
+
+``JOB_ARCHIVE_BACKEND = "table"``
+    into ``job_archive`` and ``application_archive``, in the same
+    transaction as the delete.
+``JOB_ARCHIVE_BACKEND = "jsonl"``
+    into gzip-compressed JSON-lines files under ``JOB_ARCHIVE_DIR``
+    (relative to the instance folder), one pair per day. Each batch is
+    appended as its own gzip member and synced to disk before its rows are
+    deleted, so a crash can at worst archive a batch twice.
+
+Expiry goes through the ORM so the search index, matching index and page
+cache drop the job as for any edit. Archival uses Core statements and
+adjusts the dashboard counters itself.
+"""
+import os
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, event, literal, select
+from sqlalchemy.orm import Session
+
+from bluehire import db, exports, stats
+from bluehire.models import Application, ApplicationArchive, Job, JobArchive
+
+DEFAULTS = {
+    "JOB_TTL_DAYS": 60,
+    "JOB_ARCHIVE_AFTER_DAYS": 180,
+    "JOB_ARCHIVE_BATCH_SIZE": 500,
+    "JOB_ARCHIVE_BACKEND": "table",
+    "JOB_ARCHIVE_DIR": "archive",
+}
+
+BACKENDS = ("table", "jsonl")
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    if app.config["JOB_ARCHIVE_BACKEND"] not in BACKENDS:
+        raise ValueError(f"Unknown JOB_ARCHIVE_BACKEND {app.config['JOB_ARCHIVE_BACKEND']!r}")
+
+
+def default_expiry(now=None):
+    return (now or datetime.utcnow()) + timedelta(days=current_app.config["JOB_TTL_DAYS"])
+
+
+def close(job):
+    job.status = "closed"
+    job.closed_at = datetime.utcnow()
+
+
+def reopen(job):
+    """Reopen a closed or expired job for another ``JOB_TTL_DAYS``."""
+    job.status = "open"
+    job.closed_at = None
+    job.expires_at = default_expiry()
+
+
+def expire(now=None, batch_size=None):
+    """Mark open jobs past ``expires_at`` as expired; returns how many."""
+    now = now or datetime.utcnow()
+    batch_size = batch_size or current_app.config["JOB_ARCHIVE_BATCH_SIZE"]
+    total = 0
+    while True:
+        jobs = (
+            Job.query.filter(Job.status == "open", Job.expires_at <= now)
+            .order_by(Job.expires_at)
+            .limit(batch_size)
+            .all()
+        )
+        for job in jobs:
+            job.status = "expired"
+            job.closed_at = job.expires_at
+        db.session.commit()
+        total += len(jobs)
+        if len(jobs) < batch_size:
+            return total
+
+
+def _copy_to_tables(job_ids, now):
+    for source, target, where in (
+        (Job, JobArchive, Job.id.in_(job_ids)),
+        (Application, ApplicationArchive, Application.job_id.in_(job_ids)),
+    ):
+        columns = [column.name for column in source.__table__.columns]
+        db.session.execute(
+            target.__table__.insert().from_select(
+                [*columns, "archived_at"],
+                select(*source.__table__.columns, literal(now, db.DateTime)).where(where),
+            )
+        )
+
+
+def _copy_to_files(job_ids, now):
+    directory = os.path.join(current_app.instance_path, current_app.config["JOB_ARCHIVE_DIR"])
+    os.makedirs(directory, exist_ok=True)
+    day = now.strftime("%Y%m%d")
+    for name, model, where in (
+        ("jobs", Job, Job.id.in_(job_ids)),
+        ("applications", Application, Application.job_id.in_(job_ids)),
+    ):
+        statement = select(*model.__table__.columns).where(where).order_by(model.id)
+        with open(os.path.join(directory, f"{name}-{day}.jsonl.gz"), "ab") as fh:
+            exports.write(statement, fh, "jsonl", compress=True)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+def archive(before=None, batch_size=None, backend=None):
+    """Move jobs closed or expired before ``before`` and their applications
+    out of the hot tables. Returns ``(jobs, applications)`` archived.
+    """
+    config = current_app.config
+    now = datetime.utcnow()
+    before = before or now - timedelta(days=config["JOB_ARCHIVE_AFTER_DAYS"])
+    batch_size = batch_size or config["JOB_ARCHIVE_BATCH_SIZE"]
+    copy = _copy_to_files if (backend or config["JOB_ARCHIVE_BACKEND"]) == "jsonl" else _copy_to_tables
+
+    jobs = applications = 0
+    while True:
+        job_ids = db.session.scalars(
+            select(Job.id)
+            .where(Job.status != "open", Job.closed_at < before)
+            .order_by(Job.closed_at)
+            .limit(batch_size)
+        ).all()
+        if not job_ids:
+            return jobs, applications
+        copy(job_ids, now)
+        conn = db.session.connection()
+        stats.discount(conn, Application, Application.job_id.in_(job_ids))
+        stats.discount(conn, Job, Job.id.in_(job_ids))
+        applications += conn.execute(delete(Application.__table__).where(Application.job_id.in_(job_ids))).rowcount
+        jobs += conn.execute(delete(Job.__table__).where(Job.id.in_(job_ids))).rowcount
+        db.session.commit()
+
+
+def sweep(backend=None):
+    """Expire due jobs, then archive old ones. Returns ``(expired, jobs, applications)``."""
+    expired = expire()
+    return (expired, *archive(backend=backend))
+
+
+@event.listens_for(Session, "before_flush")
+def _set_expiry(session, flush_context, instances):
+    for obj in session.new:
+        if isinstance(obj, Job) and obj.expires_at is None:
+            try:
+                obj.expires_at = default_expiry(obj.created_at)
+            except RuntimeError:
+                # No app context (e.g. a script): the job never expires.
+                return
@@ -0,0 +1,103 @@
+"""Job search filters shared by ``main.index`` and ``worker.browse_jobs``.
+
+:class:`JobFilters` parses the listing's query arguments once and turns
+them into a filtered, paginated query. The common filters are answered
+from an index in the requested order, without a sort step (``flask
+check-query-plans`` verifies this):
+
+* newest first: ``ix_job_open_created_at_id``, or
+  ``ix_job_open_location_created_at_id`` in a city; "posted within N days"
+  is a range on the same index.
+* highest salary first: ``ix_job_open_salary_max_id``, or
+  ``ix_job_open_location_salary_max_id`` in a city; a minimum salary is a
+  range on the same index.
+
+Only open jobs are listed; all of these are partial indexes over them.
+
+A minimum salary on the newest ordering is applied to rows as the index
+hands them out, except in a city: there SQLite seeks the city's salary
+range on ``ix_job_open_location_salary_max_id`` and sorts the matches.
+These combinations also sort only the matching rows: radius searches,
+which span several cities, and a text query with ``sort=newest``, which
+is limited to the search backend's ``RESULT_CAP`` ids.
+"""
+from dataclasses import astuple, dataclass
+from datetime import datetime, timedelta
+
+from bluehire import locations, page_cache, pagination, search
+from bluehire.models import Job
+
+SORTS = ("newest", "salary")
+POSTED_WITHIN_DAYS = (1, 3, 7, 30)
+
+
+def init_app(app):
+    app.add_template_global(POSTED_WITHIN_DAYS, "posted_within_choices")
+
+
+def _amount(value):
+    try:
+        amount = int(value)
+    except (TypeError, ValueError):
+        return None
+    return amount if amount >= 0 else None
+
+
+@dataclass(frozen=True)
+class JobFilters:
+    q: str = ""
+    location: str = ""
+    radius: int = 0
+    category: str = ""
+    # Jobs paying at least min_salary at the top of their range, and
+    # starting at or below max_salary.
+    min_salary: int | None = None
+    max_salary: int | None = None
+    posted_within: int = 0
+    # "" is relevance with a text query and newest otherwise.
+    sort: str = ""
+
+    @classmethod
+    def from_args(cls, args):
+        posted_within = _amount(args.get("posted_within"))
+        sort = args.get("sort", "")
+        return cls(
+            q=page_cache.normalize(args.get("q")),
+            location=page_cache.normalize(args.get("location")),
+            radius=locations.radius_arg(args.get("radius")),
+            category=page_cache.normalize(args.get("category")),
+            min_salary=_amount(args.get("min_salary")),
+            max_salary=_amount(args.get("max_salary")),
+            posted_within=posted_within if posted_within in POSTED_WITHIN_DAYS else 0,
+            sort=sort if sort in SORTS else "",
+        )
+
+    def key(self):
+        """Hashable form for cache keys."""
+        return astuple(self)
+
+    def query(self):
+        # Matches the WHERE clause of the partial listing indexes.
+        jobs_query = Job.query.filter(Job.status == "open")
+        if self.location:
+            jobs_query = jobs_query.filter(locations.job_filter(self.location, self.radius))
+        if self.category:
+            jobs_query = jobs_query.filter(Job.category.ilike(f"%{self.category}%"))
+        if self.min_salary is not None:
+            jobs_query = jobs_query.filter(Job.salary_max >= self.min_salary)
+        if self.max_salary is not None:
+            jobs_query = jobs_query.filter(Job.salary_min <= self.max_salary)
+        if self.posted_within:
+            jobs_query = jobs_query.filter(Job.created_at >= datetime.utcnow() - timedelta(days=self.posted_within))
+        if self.sort == "salary":
+            jobs_query = jobs_query.filter(Job.salary_max.is_not(None))
+        return jobs_query
+
+    def page(self, cursor=None):
+        jobs_query = self.query()
+        if self.q:
+            ranked_ids = search.ranked_job_ids(self.q)
+            if not self.sort:
+                return pagination.ranked_page(jobs_query, ranked_ids, cursor)
+            jobs_query = jobs_query.filter(Job.id.in_(ranked_ids))
+        return pagination.keyset_page(jobs_query, cursor, ordering=self.sort or "newest")
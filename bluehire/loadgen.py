@@ -0,0 +1,202 @@
+"""Synthetic data for capacity planning and benchmarks.
+
+:func:`generate` streams users, profiles, jobs and applications into the
+database with Core bulk inserts, one transaction per chunk. Rows come from
+generators and primary keys are assigned up front, so memory use stays flat
+however many rows are requested. Each table draws from its own
+``random.Random`` seeded from ``seed``, so a given seed always produces the
+same data.
+
+Values are drawn from the seed vocabularies (``CITIES``, ``SKILLS_SETS``)
+with skewed weights: a few metro cities dominate, most workers have a few
+years of experience, most jobs are recent and most applications are still
+``applied``. Jobs posted more than ``JOB_TTL_DAYS`` ago are expired.
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+from sqlalchemy import func, select
+
+from bluehire import CITIES, SKILLS_SETS, lifecycle, locations, passwords
+from bluehire.models import Application, EmployerProfile, Job, User, WorkerProfile
+
+PASSWORD = "password123"
+TITLE_SUFFIXES = ["Site Work", "Apartment Maintenance", "Night Shift", "Factory", "Warehouse", "Contract"]
+COMPANY_KINDS = ["Constructions", "Logistics", "Facility Services", "Builders", "Enterprises", "Motors"]
+# Zipf-like: earlier (bigger) cities get proportionally more rows.
+CITY_WEIGHTS = [1 / rank for rank in range(1, len(CITIES) + 1)]
+# Matches the order of Application.STATUSES.
+STATUS_WEIGHTS = [70, 15, 10, 5]
+BASE_SALARY = 12000
+JOB_TTL = timedelta(days=lifecycle.DEFAULTS["JOB_TTL_DAYS"])
+
+
+def _rng(seed, table):
+    return random.Random(f"{seed}:{table}")
+
+
+def _city(rng):
+    return rng.choices(CITIES, CITY_WEIGHTS)[0]
+
+
+def _past(rng, now, days):
+    # Squaring skews towards recent timestamps.
+    return now - timedelta(days=days * rng.random() ** 2, seconds=rng.randrange(86400))
+
+
+def _next_id(conn, model):
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class _Plan:
+    """Id ranges for every table, fixed before any row is written.
+
+    Also the city id of each seed city, since Core inserts skip the
+    ``location_id`` hook.
+    """
+
+    def __init__(self, conn, employers, workers, jobs, applications):
+        gazetteer = locations.Gazetteer()
+        gazetteer.load(conn)
+        self.city_ids = {city: gazetteer.resolve(city) for city in CITIES}
+        self.user = _next_id(conn, User)
+        self.employer = _next_id(conn, EmployerProfile)
+        self.worker = _next_id(conn, WorkerProfile)
+        self.job = _next_id(conn, Job)
+        self.application = _next_id(conn, Application)
+        self.employers = employers
+        self.workers = workers
+        self.jobs = jobs
+        self.applications = min(applications, workers * jobs)
+
+
+def _users(plan, seed, now, days, password_hash):
+    rng = _rng(seed, "user")
+    for i in range(plan.employers + plan.workers):
+        user_id = plan.user + i
+        role = "employer" if i < plan.employers else "worker"
+        yield {
+            "id": user_id,
+            "email": f"load-{role}-{user_id}@bluehire.test",
+            "phone": f"8{user_id:09d}",
+            "password_hash": password_hash,
+            "role": role,
+            "name": f"Load {role.capitalize()} {user_id}",
+            "preferred_language": "hi" if rng.random() < 0.4 else "en",
+            "created_at": _past(rng, now, days),
+        }
+
+
+def _employer_profiles(plan, seed):
+    rng = _rng(seed, "employer_profile")
+    for i in range(plan.employers):
+        city = _city(rng)
+        yield {
+            "id": plan.employer + i,
+            "user_id": plan.user + i,
+            "company_name": f"{city} {rng.choice(COMPANY_KINDS)} {i + 1}",
+            "company_description": "Synthetic employer for load testing.",
+            "location": city,
+            "location_id": plan.city_ids[city],
+        }
+
+
+def _worker_profiles(plan, seed):
+    rng = _rng(seed, "worker_profile")
+    for i in range(plan.workers):
+        skills = [skill.strip() for skill in rng.choice(SKILLS_SETS).split(",")]
+        row = {
+            "id": plan.worker + i,
+            "user_id": plan.user + plan.employers + i,
+            "skills": ", ".join(skills[: rng.randint(1, len(skills))]),
+            "experience_years": min(int(rng.expovariate(1 / 4)), 30),
+            "preferred_location": _city(rng),
+        }
+        row["location_id"] = plan.city_ids[row["preferred_location"]]
+        yield row
+
+
+def _jobs(plan, seed, now, days):
+    rng = _rng(seed, "job")
+    for i in range(plan.jobs):
+        skills = rng.choice(SKILLS_SETS)
+        category = skills.split(",")[0]
+        salary_min = int(BASE_SALARY * rng.lognormvariate(0.3, 0.3) / 500) * 500
+        row = {
+            "id": plan.job + i,
+            "title": f"{category} - {rng.choice(TITLE_SUFFIXES)}",
+            "description": "Good salary, overtime benefits, and PF/ESI as per company norms.",
+            "category": category,
+            "location": _city(rng),
+            "skills_required": skills,
+            "salary_min": salary_min,
+            "salary_max": salary_min + rng.choice([3000, 5000, 8000, 10000]),
+            "created_at": _past(rng, now, days),
+            "employer_id": plan.employer + rng.randrange(plan.employers),
+        }
+        row["location_id"] = plan.city_ids[row["location"]]
+        # Jobs older than the TTL have expired, as after a sweep.
+        row["expires_at"] = row["created_at"] + JOB_TTL
+        expired = row["expires_at"] <= now
+        row["status"] = "expired" if expired else "open"
+        row["closed_at"] = row["expires_at"] if expired else None
+        yield row
+
+
+def _applications(plan, seed, now, days):
+    rng = _rng(seed, "application")
+    application_id = plan.application
+    for i in range(plan.workers):
+        # Spread the total evenly; each worker applies to distinct jobs.
+        count = plan.applications * (i + 1) // plan.workers - plan.applications * i // plan.workers
+        for job_offset in rng.sample(range(plan.jobs), count):
+            yield {
+                "id": application_id,
+                "worker_id": plan.worker + i,
+                "job_id": plan.job + job_offset,
+                "status": rng.choices(Application.STATUSES, STATUS_WEIGHTS)[0],
+                "applied_at": _past(rng, now, days),
+            }
+            application_id += 1
+
+
+def generate(engine, employers, workers, jobs, applications, seed=42, chunk=10000, days=365, report=print):
+    """Insert the requested rows; returns ``{table: (rows, seconds)}``."""
+    if jobs and not employers:
+        raise ValueError("jobs need at least one employer")
+    if applications and not (workers and jobs):
+        raise ValueError("applications need workers and jobs")
+    with passwords.fast_mode():
+        password_hash = passwords.hash_password(PASSWORD)
+    with engine.connect() as conn:
+        plan = _Plan(conn, employers, workers, jobs, applications)
+    now = datetime.utcnow()
+
+    results = {}
+    for model, rows in (
+        (User, _users(plan, seed, now, days, password_hash)),
+        (EmployerProfile, _employer_profiles(plan, seed)),
+        (WorkerProfile, _worker_profiles(plan, seed)),
+        (Job, _jobs(plan, seed, now, days)),
+        (Application, _applications(plan, seed, now, days)),
+    ):
+        table = model.__table__
+        start = time.perf_counter()
+        count = 0
+        for batch in _batched(rows, chunk):
+            with engine.begin() as conn:
+                conn.execute(table.insert(), batch)
+            count += len(batch)
+        elapsed = time.perf_counter() - start
+        results[table.name] = (count, elapsed)
+        if count:
+            report(f"{table.name}: {count} rows in {elapsed:.1f}s ({count / elapsed:,.0f} rows/s)")
+    return results
@@ -0,0 +1,234 @@
+"""Canonical cities for job and profile locations.
+
+Locations are still typed as free text, but every job, worker profile and
+employer profile also carries a ``location_id`` pointing at a row of the
+``city`` table, resolved on write. The table is seeded from the bundled
+offline dataset ``data/cities.csv`` (name, state, latitude, longitude and
+``|``-separated aliases), so "Bangalore", "bengaluru " and "Bengaluru,
+Karnataka" all resolve to the same city.
+
+Location filters compare ``location_id`` on an index instead of running
+``ILIKE '%...%'`` over every row. "Within N km" searches look up nearby
+cities in an in-memory grid of ``GRID_DEGREES`` cells, check the exact
+great-circle distance, and filter jobs with ``location_id IN (...)``. Text
+that names no known city (an area, a typo) falls back to the substring
+match.
+
+The gazetteer is loaded from the database once per process; restart after
+``flask load-cities`` adds cities.
+"""
+import csv
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.orm import Session
+
+from bluehire import db
+from bluehire.models import City, CityAlias, EmployerProfile, Job, WorkerProfile
+
+DEFAULTS = {
+    "LOCATION_MAX_RADIUS_KM": 250,
+}
+
+DATASET = os.path.join(os.path.dirname(__file__), "data", "cities.csv")
+RADIUS_CHOICES_KM = (10, 25, 50, 100, 250)
+GRID_DEGREES = 0.5
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Free-text location column of each model that carries a location_id.
+LOCATED = {Job: "location", WorkerProfile: "preferred_location", EmployerProfile: "location"}
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+
+
+def normalize(value):
+    """Lookup key for a place name: lower-case words without punctuation."""
+    return " ".join(_PUNCTUATION_RE.sub(" ", (value or "").lower()).split())
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _cell(lat, lon):
+    return math.floor(lat / GRID_DEGREES), math.floor(lon / GRID_DEGREES)
+
+
+class Gazetteer:
+    def __init__(self):
+        self.aliases = {}
+        self.cities = {}
+        self.grid = defaultdict(list)
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self, conn):
+        cities = {row.id: row for row in conn.execute(select(City.id, City.name, City.state, City.lat, City.lon))}
+        aliases = dict(conn.execute(select(CityAlias.alias, CityAlias.city_id)).all())
+        grid = defaultdict(list)
+        for city in cities.values():
+            grid[_cell(city.lat, city.lon)].append(city.id)
+        with self.lock:
+            self.cities, self.aliases, self.grid = cities, aliases, grid
+            self.loaded = True
+
+    def resolve(self, value):
+        """City id for a free-text location, or ``None``.
+
+        Without a match for the whole text, each comma-separated part is
+        tried, most specific first: "Bengaluru, Karnataka" resolves through
+        "Bengaluru" and "Andheri, Mumbai" through "Mumbai".
+        """
+        city_id = self.aliases.get(normalize(value))
+        if city_id is None and "," in (value or ""):
+            for part in value.split(","):
+                city_id = self.aliases.get(normalize(part))
+                if city_id is not None:
+                    break
+        return city_id
+
+    def nearby(self, city_id, radius_km):
+        """Ids of cities within ``radius_km`` of ``city_id``, itself included."""
+        origin = self.cities[city_id]
+        dlat = radius_km / KM_PER_DEGREE
+        # Widest at the pole-ward edge of the box; clamp so cos() stays positive.
+        edge = min(abs(origin.lat) + dlat, 89.0)
+        dlon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(edge)))
+        low_row, low_col = _cell(origin.lat - dlat, origin.lon - dlon)
+        high_row, high_col = _cell(origin.lat + dlat, origin.lon + dlon)
+
+        found = []
+        for row in range(low_row, high_row + 1):
+            for col in range(low_col, high_col + 1):
+                for candidate in self.grid.get((row, col), ()):
+                    city = self.cities[candidate]
+                    if distance_km(origin.lat, origin.lon, city.lat, city.lon) <= radius_km:
+                        found.append(candidate)
+        return found
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.extensions["locations"] = Gazetteer()
+    app.add_template_global(RADIUS_CHOICES_KM, "radius_choices")
+
+
+def get_gazetteer(conn=None):
+    gazetteer = current_app.extensions["locations"]
+    if not gazetteer.loaded:
+        gazetteer.load(conn if conn is not None else db.session.connection())
+    return gazetteer
+
+
+def resolve(value):
+    return get_gazetteer().resolve(value)
+
+
+def radius_arg(value):
+    """Parse a ``radius`` query argument in km; 0 for none or invalid."""
+    try:
+        radius = int(value or 0)
+    except ValueError:
+        return 0
+    return min(max(radius, 0), current_app.config["LOCATION_MAX_RADIUS_KM"])
+
+
+def job_filter(location, radius_km=0):
+    """SQL criterion for jobs at (or within ``radius_km`` of) ``location``."""
+    gazetteer = get_gazetteer()
+    city_id = gazetteer.resolve(location)
+    if city_id is None:
+        return Job.location.ilike(f"%{location}%")
+    if not radius_km:
+        return Job.location_id == city_id
+    return Job.location_id.in_(gazetteer.nearby(city_id, radius_km))
+
+
+def read_dataset(path=DATASET):
+    """Yield ``(name, state, lat, lon, aliases)`` from a cities CSV."""
+    with open(path, encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            aliases = [alias for alias in (row.get("aliases") or "").split("|") if alias.strip()]
+            yield row["name"].strip(), row["state"].strip(), float(row["lat"]), float(row["lon"]), aliases
+
+
+def seed(conn, rows):
+    """Insert or update cities and their aliases; returns the number of cities.
+
+    A city's own name is always one of its aliases. An alias already taken
+    by another city is left alone.
+    """
+    existing = {
+        (name, state): city_id for city_id, name, state in conn.execute(select(City.id, City.name, City.state))
+    }
+    taken = dict(conn.execute(select(CityAlias.alias, CityAlias.city_id)).all())
+    count = 0
+    for name, state, lat, lon, aliases in rows:
+        city_id = existing.get((name, state))
+        if city_id is None:
+            insert = City.__table__.insert().values(name=name, state=state, lat=lat, lon=lon)
+            city_id = conn.execute(insert).inserted_primary_key[0]
+            existing[(name, state)] = city_id
+        else:
+            conn.execute(City.__table__.update().where(City.id == city_id).values(lat=lat, lon=lon))
+        new = []
+        for alias in (name, *aliases):
+            key = normalize(alias)
+            if key and key not in taken:
+                taken[key] = city_id
+                new.append({"alias": key, "city_id": city_id})
+        if new:
+            conn.execute(CityAlias.__table__.insert(), new)
+        count += 1
+    return count
+
+
+def backfill(conn, only_missing=True):
+    """Set ``location_id`` from the free-text location on every located table.
+
+    Each distinct location string is resolved once. Returns rows updated.
+    """
+    gazetteer = Gazetteer()
+    gazetteer.load(conn)
+    updated = 0
+    for model, column in LOCATED.items():
+        table = model.__table__.name
+        where = f"{column} IS NOT NULL" + (" AND location_id IS NULL" if only_missing else "")
+        values = [value for (value,) in conn.execute(text(f"SELECT DISTINCT {column} FROM {table} WHERE {where}"))]
+        params = [{"city_id": gazetteer.resolve(value), "value": value} for value in values]
+        params = [param for param in params if param["city_id"] is not None]
+        if params:
+            result = conn.execute(
+                text(f"UPDATE {table} SET location_id = :city_id WHERE {column} = :value AND {where}"), params
+            )
+            updated += result.rowcount
+    return updated
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_location_ids(session, flush_context, instances):
+    try:
+        gazetteer = current_app.extensions.get("locations")
+    except RuntimeError:
+        return
+    if gazetteer is None:
+        return
+    for obj in (*session.new, *session.dirty):
+        column = LOCATED.get(type(obj))
+        if column is None:
+            continue
+        if obj in session.new or inspect(obj).attrs[column].history.has_changes():
+            if not gazetteer.loaded:
+                with session.no_autoflush:
+                    gazetteer.load(session.connection())
+            obj.location_id = gazetteer.resolve(getattr(obj, column))
@@ -1,27 +1,29 @@
-from flask import render_template, request
+from flask import abort, jsonify, render_template, request
 from flask_login import current_user
 
-from bluehire.models import Job
+from bluehire import autocomplete, listing, page_cache, replicas
 from . import main_bp
 
 
 @main_bp.route("/")
+@replicas.read_only
 def index():
-    q = request.args.get("q", "")
-    location = request.args.get("location", "")
-    category = request.args.get("category", "")
+    filters = listing.JobFilters.from_args(request.args)
+    cursor = request.args.get("cursor")
 
-    jobs_query = Job.query
-    if q:
-        like = f"%{q}%"
-        jobs_query = jobs_query.filter(Job.title.ilike(like) | Job.skills_required.ilike(like))
-    if location:
-        jobs_query = jobs_query.filter(Job.location.ilike(f"%{location}%"))
-    if category:
-        jobs_query = jobs_query.filter(Job.category.ilike(f"%{category}%"))
+    def render():
+        page = filters.page(cursor)
+        return render_template("index.html", jobs=page.items, page=page, filters=filters, user=current_user)
 
-    jobs = jobs_query.order_by(Job.created_at.desc()).limit(20).all()
-
-    return render_template("index.html", jobs=jobs, q=q, location=location, category=category, user=current_user)
+    return page_cache.cached_response(("index", *filters.key(), cursor), render)
 
 
+@main_bp.route("/autocomplete")
+def suggest():
+    kind = request.args.get("kind", "skill")
+    if kind not in autocomplete.KINDS:
+        abort(400)
+    response = jsonify(autocomplete.complete(kind, request.args.get("q", "")))
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response
@@ -0,0 +1,322 @@
+"""Skill-based matching between jobs and workers.
+
+``Job.skills_required`` (plus the category) and ``WorkerProfile.skills`` are
+normalized into a shared skill vocabulary. Jobs and workers are then grouped
+into buckets of identical sparse skill vectors and location (and, for
+workers, experience), and an inverted index maps each skill to the buckets
+containing it. A query scores each candidate bucket once, which scores every
+member in one step, so the cost depends on the number of distinct skill
+profiles rather than on the number of jobs.
+
+Only open jobs are indexed. Scores are the idf-weighted cosine similarity of the skill vectors plus a
+bonus for the same city and, when ranking workers, for experience.
+
+The index is loaded from the database on first use and reloaded every
+``MATCHING_RELOAD_INTERVAL`` seconds, which picks up jobs and profiles
+written by other processes; one request reloads while the others keep
+using the previous index (see :mod:`bluehire.reloading`). In between, changes committed in this process
+are applied when their transaction commits; rolled-back ones never are.
+"""
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import current_app
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, selectinload
+
+from bluehire import db, reloading
+from bluehire.models import Job, WorkerProfile
+
+DEFAULTS = {
+    "MATCHING_RELOAD_INTERVAL": 300,
+}
+
+LOCATION_WEIGHT = 0.3
+EXPERIENCE_WEIGHT = 0.2
+# Years of experience beyond which a worker gets no extra credit.
+EXPERIENCE_CAP = 10
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_skill(value):
+    return _SPACE_RE.sub(" ", value.strip().lower())
+
+
+def split_skills(value):
+    """Split a free-text comma-separated skill list into normalized skills."""
+    return [skill for skill in (normalize_skill(part) for part in (value or "").split(",")) if skill]
+
+
+def normalize_location(value):
+    return normalize_skill(value or "")
+
+
+class _Side:
+    """Entities of one kind (jobs or workers) grouped by skill vector.
+
+    ``groups`` maps each distinct skill set to its buckets keyed by
+    ``(location, experience)``; ``postings`` is the inverted index from a
+    skill id to the skill sets containing it.
+    """
+
+    def __init__(self):
+        self.key_of = {}
+        self.groups = {}
+        self.postings = defaultdict(set)
+        self.df = Counter()
+
+    def add(self, entity_id, skills, location, experience=0):
+        self.remove(entity_id)
+        group = self.groups.get(skills)
+        if group is None:
+            group = self.groups[skills] = {}
+            for skill in skills:
+                self.postings[skill].add(skills)
+        group.setdefault((location, experience), set()).add(entity_id)
+        self.key_of[entity_id] = (skills, location, experience)
+        self.df.update(skills)
+
+    def remove(self, entity_id):
+        key = self.key_of.pop(entity_id, None)
+        if key is None:
+            return
+        skills, location, experience = key
+        group = self.groups[skills]
+        members = group[(location, experience)]
+        members.discard(entity_id)
+        self.df.subtract(skills)
+        if not members:
+            del group[(location, experience)]
+        if not group:
+            del self.groups[skills]
+            for skill in skills:
+                self.postings[skill].discard(skills)
+
+    def candidates(self, skills):
+        groups = set()
+        for skill in skills:
+            groups |= self.postings.get(skill, set())
+        return groups
+
+
+class MatchIndex:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reload_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.vocabulary = {}
+        self.jobs = _Side()
+        self.workers = _Side()
+        self.loaded_at = None
+
+    def _skill_ids(self, skills, grow=True):
+        ids = set()
+        for skill in skills:
+            skill_id = self.vocabulary.get(skill)
+            if skill_id is None and grow:
+                skill_id = self.vocabulary[skill] = len(self.vocabulary)
+            if skill_id is not None:
+                ids.add(skill_id)
+        return frozenset(ids)
+
+    def add_job(self, job_id, skills_required, category, location):
+        skills = split_skills(skills_required) + split_skills(category)
+        with self.lock:
+            self.jobs.add(job_id, self._skill_ids(skills), normalize_location(location))
+
+    def add_worker(self, worker_id, skills, location, experience_years):
+        experience = min(max(experience_years or 0, 0), EXPERIENCE_CAP)
+        with self.lock:
+            skill_ids = self._skill_ids(split_skills(skills))
+            self.workers.add(worker_id, skill_ids, normalize_location(location), experience)
+
+    def _idf(self, skill_id):
+        total = max(len(self.jobs.key_of), 1)
+        return math.log(1 + total / max(self.jobs.df[skill_id], 1))
+
+    def _rank(self, side, skills, location, k, exclude, experience_weight):
+        if not skills:
+            return []
+        weight = {}
+        for group in side.candidates(skills):
+            for skill in group:
+                if skill not in weight:
+                    weight[skill] = self._idf(skill) ** 2
+        for skill in skills:
+            weight.setdefault(skill, self._idf(skill) ** 2)
+        query_norm = math.sqrt(sum(weight[skill] for skill in skills)) or 1.0
+
+        groups = []
+        for group in side.candidates(skills):
+            dot = sum(weight[skill] for skill in skills & group)
+            norm = math.sqrt(sum(weight[skill] for skill in group)) or 1.0
+            groups.append((dot / (query_norm * norm), group))
+        groups.sort(key=lambda item: item[0], reverse=True)
+
+        # Threshold algorithm: walk skill groups by similarity and stop once
+        # no bucket in the remaining groups can beat the current top buckets.
+        need = k + len(exclude)
+        max_bonus = LOCATION_WEIGHT + experience_weight
+        top = []
+        held = 0
+        counter = 0
+        for similarity, group in groups:
+            if held >= need and similarity + max_bonus < top[0][0]:
+                break
+            for (bucket_location, experience), members in side.groups[group].items():
+                score = similarity + experience_weight * experience / EXPERIENCE_CAP
+                if location and bucket_location == location:
+                    score += LOCATION_WEIGHT
+                counter += 1
+                heapq.heappush(top, (score, counter, members))
+                held += len(members)
+                while held - len(top[0][2]) >= need:
+                    held -= len(heapq.heappop(top)[2])
+
+        results = []
+        for score, _, members in sorted(top, reverse=True):
+            # Newest entities first within a bucket of equal scores.
+            for entity_id in sorted(members, reverse=True):
+                if entity_id in exclude:
+                    continue
+                results.append((entity_id, score))
+                if len(results) == k:
+                    return results
+        return results
+
+    def top_jobs(self, skills, location, k=10, exclude=()):
+        """Return ``[(job_id, score), ...]`` for a worker's skills and city."""
+        with self.lock:
+            skill_ids = self._skill_ids(split_skills(skills), grow=False)
+            return self._rank(self.jobs, skill_ids, normalize_location(location), k, set(exclude), 0.0)
+
+    def top_workers(self, skills_required, category, location, k=10, exclude=()):
+        """Return ``[(worker_profile_id, score), ...]`` for a job."""
+        with self.lock:
+            skills = split_skills(skills_required) + split_skills(category)
+            skill_ids = self._skill_ids(skills, grow=False)
+            return self._rank(
+                self.workers, skill_ids, normalize_location(location), k, set(exclude), EXPERIENCE_WEIGHT
+            )
+
+    def remove_job(self, job_id):
+        with self.lock:
+            self.jobs.remove(job_id)
+
+    def remove_worker(self, worker_id):
+        with self.lock:
+            self.workers.remove(worker_id)
+
+    def load(self, conn):
+        # Built aside and swapped in, so queries keep using the old index meanwhile.
+        fresh = MatchIndex()
+        jobs = conn.execution_options(yield_per=5000).execute(
+            text("SELECT id, skills_required, category, location FROM job WHERE status = 'open'")
+        )
+        for row in jobs:
+            fresh.add_job(*row)
+        workers = conn.execution_options(yield_per=5000).execute(
+            text("SELECT id, skills, preferred_location, experience_years FROM worker_profile")
+        )
+        for row in workers:
+            fresh.add_worker(*row)
+        with self.lock:
+            self.vocabulary, self.jobs, self.workers = fresh.vocabulary, fresh.jobs, fresh.workers
+            self.loaded_at = time.monotonic()
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.extensions["matching"] = MatchIndex()
+
+
+def get_index():
+    index = current_app.extensions["matching"]
+    # From the primary even in a read-only view: the index outlives the request.
+    reloading.reload_if_stale(
+        index,
+        current_app.config["MATCHING_RELOAD_INTERVAL"],
+        lambda: index.load(db.session.connection(bind_arguments={"bind": db.engine})),
+    )
+    return index
+
+
+def recommend_jobs(profile, k=5, exclude=()):
+    """Jobs best matching a worker profile, best first."""
+    matches = get_index().top_jobs(profile.skills, profile.preferred_location, k, exclude)
+    # Another process may have closed or expired a job this index still holds.
+    return [job for job in _load(Job, matches) if job.status == "open"]
+
+
+def suggest_workers(job, k=5, exclude=()):
+    """Worker profiles best matching a job, best first."""
+    matches = get_index().top_workers(job.skills_required, job.category, job.location, k, exclude)
+    return _load(WorkerProfile, matches, selectinload(WorkerProfile.user))
+
+
+def _load(model, matches, *options):
+    if not matches:
+        return []
+    ids = [entity_id for entity_id, _ in matches]
+    rows = {row.id: row for row in model.query.options(*options).filter(model.id.in_(ids))}
+    return [rows[entity_id] for entity_id in ids if entity_id in rows]
+
+
+def _loaded_index():
+    try:
+        index = current_app.extensions.get("matching")
+    except RuntimeError:
+        return None
+    return index if index is not None and index.loaded_at is not None else None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    # Values are copied now: after the commit the objects are expired.
+    changes = []
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, Job):
+            if obj.status == "open":
+                changes.append((Job, obj.id, (obj.skills_required, obj.category, obj.location)))
+            else:
+                changes.append((Job, obj.id, None))
+        elif isinstance(obj, WorkerProfile):
+            changes.append(
+                (WorkerProfile, obj.id, (obj.skills, obj.preferred_location, obj.experience_years))
+            )
+    for obj in session.deleted:
+        if isinstance(obj, (Job, WorkerProfile)):
+            changes.append((type(obj), obj.id, None))
+    if changes:
+        session.info.setdefault("matching_changes", []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    changes = session.info.pop("matching_changes", None)
+    index = _loaded_index() if changes else None
+    if index is None:
+        return
+    for model, entity_id, values in changes:
+        if model is Job:
+            if values is None:
+                index.remove_job(entity_id)
+            else:
+                index.add_job(entity_id, *values)
+        elif values is None:
+            index.remove_worker(entity_id)
+        else:
+            index.add_worker(entity_id, *values)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("matching_changes", None)
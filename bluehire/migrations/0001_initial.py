@@ -0,0 +1,13 @@
+"""Create any missing tables from the models (the pre-migration baseline).
+
+The dashboard counters are new on a pre-migration database, so they are
+filled from the existing rows here rather than starting at zero.
+"""
+from bluehire import db
+
+
+def upgrade(conn):
+    from bluehire import models, stats  # noqa: F401
+
+    db.metadata.create_all(conn)
+    stats.reconcile(conn)
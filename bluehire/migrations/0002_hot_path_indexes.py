@@ -0,0 +1,57 @@
+"""Indexes for the columns every dashboard filters on, plus uniqueness.
+
+Before the unique indexes are built, duplicates are merged into the
+oldest row (the one ``filter_by(user_id=...).first()`` has been returning):
+
+* a user's extra worker or employer profiles, after moving their
+  applications or jobs to the kept profile;
+* duplicate applications (possible while uniqueness was only checked in
+  ``apply_job``, and after merging profiles), which are also taken out of
+  the dashboard counters.
+"""
+from sqlalchemy import func, select
+
+from bluehire import stats
+from bluehire.models import Application
+
+INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_employer_profile_user_id ON employer_profile (user_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_worker_profile_user_id ON worker_profile (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_job_employer_id ON job (employer_id)",
+    "CREATE INDEX IF NOT EXISTS ix_job_created_at_id ON job (created_at, id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_application_worker_job ON application (worker_id, job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_application_job_id ON application (job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_otp_phone_code ON otp (phone, code, is_used)",
+    "CREATE INDEX IF NOT EXISTS ix_otp_phone_created_at ON otp (phone, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_otp_created_at ON otp (created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_notification_due ON notification (status, next_attempt_at)",
+]
+
+# profile table -> (referencing table, referencing column)
+PROFILE_REFERENCES = {
+    "worker_profile": ("application", "worker_id"),
+    "employer_profile": ("job", "employer_id"),
+}
+
+
+def _merge_profiles(conn, profile, table, column):
+    kept = f"SELECT MIN(id) FROM {profile} GROUP BY user_id"
+    conn.exec_driver_sql(
+        f"UPDATE {table} SET {column} = ("
+        f"SELECT MIN(k.id) FROM {profile} k JOIN {profile} p ON p.user_id = k.user_id WHERE p.id = {table}.{column}"
+        f") WHERE {column} IN (SELECT id FROM {profile}) AND {column} NOT IN ({kept})"
+    )
+    conn.exec_driver_sql(f"DELETE FROM {profile} WHERE id NOT IN ({kept})")
+
+
+def upgrade(conn):
+    for profile, (table, column) in PROFILE_REFERENCES.items():
+        _merge_profiles(conn, profile, table, column)
+
+    duplicate = Application.id.not_in(
+        select(func.min(Application.id)).group_by(Application.worker_id, Application.job_id)
+    )
+    stats.discount(conn, Application, duplicate)
+    conn.execute(Application.__table__.delete().where(duplicate))
+    for ddl in INDEXES:
+        conn.exec_driver_sql(ddl)
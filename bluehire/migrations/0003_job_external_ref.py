@@ -0,0 +1,9 @@
+"""External reference ids on jobs, unique per employer, for bulk import upserts."""
+from bluehire.migrations import add_column
+
+
+def upgrade(conn):
+    add_column(conn, "job", "external_ref VARCHAR(100)")
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_job_employer_external_ref ON job (employer_id, external_ref)"
+    )
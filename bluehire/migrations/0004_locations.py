@@ -0,0 +1,25 @@
+"""Canonical city table with aliases, and ``location_id`` on jobs and profiles.
+
+The cities are seeded from the bundled dataset and existing rows are
+backfilled by resolving their free-text location.
+"""
+from bluehire import locations
+from bluehire.migrations import add_column
+from bluehire.models import City, CityAlias
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_job_location_created_at_id ON job (location_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_worker_profile_location_id ON worker_profile (location_id)",
+    "CREATE INDEX IF NOT EXISTS ix_employer_profile_location_id ON employer_profile (location_id)",
+]
+
+
+def upgrade(conn):
+    City.__table__.create(conn, checkfirst=True)
+    CityAlias.__table__.create(conn, checkfirst=True)
+    for table in ("job", "worker_profile", "employer_profile"):
+        add_column(conn, table, "location_id INTEGER REFERENCES city (id)")
+    for ddl in INDEXES:
+        conn.exec_driver_sql(ddl)
+    locations.seed(conn, locations.read_dataset())
+    locations.backfill(conn)
@@ -0,0 +1,11 @@
+"""Indexes for salary-sorted and minimum-salary job listings."""
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_job_salary_max_id ON job (salary_max, id)",
+    "CREATE INDEX IF NOT EXISTS ix_job_location_salary_max_id ON job (location_id, salary_max, id)",
+]
+
+
+def upgrade(conn):
+    for ddl in INDEXES:
+        conn.exec_driver_sql(ddl)
@@ -0,0 +1,43 @@
+"""Job status and expiry, archive tables, and partial indexes over open jobs.
+
+Existing jobs expire ``JOB_TTL_DAYS`` after they were posted, so the first
+``flask sweep-jobs`` retires postings that have been stale for a long time.
+The full-table listing indexes from 0004 and 0005 are replaced by partial
+ones covering open jobs only.
+"""
+from sqlalchemy import Column, DateTime
+
+from bluehire.lifecycle import DEFAULTS
+from bluehire.migrations import add_column
+from bluehire.models import ApplicationArchive, JobArchive
+
+OPEN = "WHERE status = 'open'"
+INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS ix_job_open_created_at_id ON job (created_at, id) {OPEN}",
+    f"CREATE INDEX IF NOT EXISTS ix_job_open_location_created_at_id ON job (location_id, created_at, id) {OPEN}",
+    f"CREATE INDEX IF NOT EXISTS ix_job_open_salary_max_id ON job (salary_max, id) {OPEN}",
+    f"CREATE INDEX IF NOT EXISTS ix_job_open_location_salary_max_id ON job (location_id, salary_max, id) {OPEN}",
+    f"CREATE INDEX IF NOT EXISTS ix_job_open_expires_at ON job (expires_at) {OPEN}",
+    "CREATE INDEX IF NOT EXISTS ix_job_not_open_closed_at ON job (closed_at) WHERE status != 'open'",
+]
+REPLACED = ["ix_job_location_created_at_id", "ix_job_salary_max_id", "ix_job_location_salary_max_id"]
+
+
+def upgrade(conn):
+    add_column(conn, "job", "status VARCHAR(20) NOT NULL DEFAULT 'open'")
+    add_column(conn, "job", Column("expires_at", DateTime))
+    add_column(conn, "job", Column("closed_at", DateTime))
+    JobArchive.__table__.create(conn, checkfirst=True)
+    ApplicationArchive.__table__.create(conn, checkfirst=True)
+
+    days = DEFAULTS["JOB_TTL_DAYS"]
+    if conn.dialect.name == "sqlite":
+        expiry = f"datetime(created_at, '+{days} days')"
+    else:
+        expiry = f"created_at + interval '{days} days'"
+    conn.exec_driver_sql(f"UPDATE job SET expires_at = {expiry} WHERE expires_at IS NULL")
+
+    for name in REPLACED:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    for ddl in INDEXES:
+        conn.exec_driver_sql(ddl)
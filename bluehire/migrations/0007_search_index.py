@@ -0,0 +1,16 @@
+"""Create the job search index, which the app used to create on startup.
+
+On SQLite builds with FTS5 this is the ``job_fts`` table, filled from the
+open jobs if it is new. Other databases use the in-process index and need
+nothing here.
+"""
+from sqlalchemy import inspect
+
+from bluehire import search
+
+
+def upgrade(conn):
+    backend = search.detect_backend(conn)
+    if isinstance(backend, search.FTS5Backend) and not inspect(conn).has_table("job_fts"):
+        backend.create(conn)
+        backend.rebuild(conn)
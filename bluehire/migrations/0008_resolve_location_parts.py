@@ -0,0 +1,10 @@
+"""Resolve locations whose city is a later comma-separated part.
+
+Until now only the first part was tried, so "Andheri, Mumbai" was left
+without a ``location_id`` and dropped from city-filtered listings.
+"""
+from bluehire import locations
+
+
+def upgrade(conn):
+    locations.backfill(conn)
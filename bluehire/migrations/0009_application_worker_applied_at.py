@@ -0,0 +1,7 @@
+"""Index a worker's applications by date, for the newest-first dashboard list."""
+
+
+def upgrade(conn):
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_application_worker_applied_at ON application (worker_id, applied_at)"
+    )
@@ -0,0 +1,72 @@
+"""Versioned schema migrations.
+
+Each ``NNNN_name.py`` module in this package defines ``upgrade(conn)`` and
+is applied once, in order, inside its own transaction. Applied versions are
+recorded in the ``schema_version`` table. Migrations must be idempotent
+against a schema created from the current models (``0001`` does exactly
+that for a fresh database), so later steps use ``IF NOT EXISTS`` and
+:func:`add_column` rather than assuming the previous shape.
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select
+from sqlalchemy.schema import CreateColumn
+
+_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def available():
+    """Return ``[(version, name, module), ...]`` sorted by version."""
+    found = []
+    for info in pkgutil.iter_modules(__path__):
+        prefix, _, _ = info.name.partition("_")
+        if prefix.isdigit():
+            found.append((int(prefix), info.name, importlib.import_module(f"{__name__}.{info.name}")))
+    return sorted(found, key=lambda item: item[0])
+
+
+def current_version(conn):
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return conn.execute(select(schema_version.c.version).order_by(schema_version.c.version.desc())).scalar() or 0
+
+
+def upgrade(engine):
+    """Apply pending migrations. Returns the names of those applied."""
+    with engine.begin() as conn:
+        _metadata.create_all(conn)
+        version = current_version(conn)
+    applied = []
+    for number, name, module in available():
+        if number <= version:
+            continue
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_version.insert().values(version=number, name=name, applied_at=datetime.utcnow()))
+        applied.append(name)
+    return applied
+
+
+def add_column(conn, table, column_ddl):
+    """``ALTER TABLE ... ADD COLUMN`` unless the column already exists.
+
+    ``column_ddl`` is portable DDL text, or a :class:`~sqlalchemy.Column`
+    for types spelled differently per database (``DateTime`` is
+    ``DATETIME`` on SQLite but ``TIMESTAMP WITHOUT TIME ZONE`` on PostgreSQL).
+    """
+    if isinstance(column_ddl, Column):
+        name = column_ddl.name
+        column_ddl = str(CreateColumn(column_ddl).compile(dialect=conn.dialect))
+    else:
+        name = column_ddl.split()[0]
+    if name not in {column["name"] for column in inspect(conn).get_columns(table)}:
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column_ddl}")
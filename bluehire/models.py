@@ -1,8 +1,31 @@
 from datetime import datetime
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 
-from bluehire import db, login_manager
+from bluehire import db, login_manager, passwords
+
+
+# Partial index conditions for Job.
+_OPEN = {"sqlite_where": db.text("status = 'open'"), "postgresql_where": db.text("status = 'open'")}
+_NOT_OPEN = {"sqlite_where": db.text("status != 'open'"), "postgresql_where": db.text("status != 'open'")}
+
+
+class City(db.Model):
+    """A canonical city from bluehire/data/cities.csv."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    state = db.Column(db.String(100), nullable=False)
+    lat = db.Column(db.Float, nullable=False)
+    lon = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint("name", "state", name="uq_city_name_state"),)
+
+
+class CityAlias(db.Model):
+    """Normalized spelling of a city name (the name itself included)."""
+
+    alias = db.Column(db.String(100), primary_key=True)
+    city_id = db.Column(db.Integer, db.ForeignKey("city.id"), nullable=False)
 
 
 class User(UserMixin, db.Model):
@@ -19,15 +42,25 @@ class User(UserMixin, db.Model):
     worker_profile = db.relationship("WorkerProfile", backref="user", uselist=False)
 
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = passwords.hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        """Verify ``password``, re-hashing it if the hash parameters changed.
+
+        A re-hash only modifies the object; the caller commits it.
+        """
+        if not passwords.verify_password(self.password_hash, password):
+            return False
+        if passwords.needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    from bluehire.user_cache import get_cache
+
+    return get_cache().get(int(user_id))
 
 
 class EmployerProfile(db.Model):
@@ -36,9 +69,15 @@ class EmployerProfile(db.Model):
     company_name = db.Column(db.String(200), nullable=False)
     company_description = db.Column(db.Text)
     location = db.Column(db.String(200))
+    location_id = db.Column(db.Integer, db.ForeignKey("city.id"))
 
     jobs = db.relationship("Job", backref="employer", lazy=True)
 
+    __table_args__ = (
+        db.Index("uq_employer_profile_user_id", "user_id", unique=True),
+        db.Index("ix_employer_profile_location_id", "location_id"),
+    )
+
 
 class WorkerProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -46,9 +85,19 @@ class WorkerProfile(db.Model):
     skills = db.Column(db.String(255))
     experience_years = db.Column(db.Integer, default=0)
     preferred_location = db.Column(db.String(200))
+    location_id = db.Column(db.Integer, db.ForeignKey("city.id"))
+
+    __table_args__ = (
+        db.Index("uq_worker_profile_user_id", "user_id", unique=True),
+        db.Index("ix_worker_profile_location_id", "location_id"),
+    )
 
 
 class Job(db.Model):
+    # open -> closed (by the employer) or expired (by the sweeper); only
+    # open jobs are listed, searched and matched.
+    STATUSES = ("open", "closed", "expired")
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -59,17 +108,48 @@ class Job(db.Model):
     salary_max = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     employer_id = db.Column(db.Integer, db.ForeignKey("employer_profile.id"), nullable=False)
+    # The employer's own id for the posting; bulk imports upsert on it.
+    external_ref = db.Column(db.String(100))
+    # Canonical city resolved from ``location`` by bluehire.locations.
+    location_id = db.Column(db.Integer, db.ForeignKey("city.id"))
+    status = db.Column(db.String(20), nullable=False, default="open")
+    expires_at = db.Column(db.DateTime)  # set on insert by bluehire.lifecycle
+    closed_at = db.Column(db.DateTime)  # when the job stopped being open
 
     applications = db.relationship("Application", backref="job", lazy=True)
 
+    __table_args__ = (
+        db.Index("ix_job_employer_id", "employer_id"),
+        db.Index("ix_job_created_at_id", "created_at", "id"),
+        db.Index("uq_job_employer_external_ref", "employer_id", "external_ref", unique=True),
+        # Listings only ever show open jobs, so their indexes cover open
+        # jobs only and stay the size of the live inventory.
+        db.Index("ix_job_open_created_at_id", "created_at", "id", **_OPEN),
+        db.Index("ix_job_open_location_created_at_id", "location_id", "created_at", "id", **_OPEN),
+        db.Index("ix_job_open_salary_max_id", "salary_max", "id", **_OPEN),
+        db.Index("ix_job_open_location_salary_max_id", "location_id", "salary_max", "id", **_OPEN),
+        db.Index("ix_job_open_expires_at", "expires_at", **_OPEN),
+        db.Index("ix_job_not_open_closed_at", "closed_at", **_NOT_OPEN),
+    )
+
 
 class Application(db.Model):
+    STATUSES = ("applied", "shortlisted", "rejected", "hired")
+
     id = db.Column(db.Integer, primary_key=True)
     worker_id = db.Column(db.Integer, db.ForeignKey("worker_profile.id"), nullable=False)
     job_id = db.Column(db.Integer, db.ForeignKey("job.id"), nullable=False)
-    status = db.Column(db.String(50), default="applied")  # applied, shortlisted, rejected, hired
+    status = db.Column(db.String(50), default="applied")
     applied_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Also serves lookups by worker_id alone.
+        db.Index("uq_application_worker_job", "worker_id", "job_id", unique=True),
+        db.Index("ix_application_job_id", "job_id"),
+        # The worker dashboard lists applications newest first.
+        db.Index("ix_application_worker_applied_at", "worker_id", "applied_at"),
+    )
+
 
 class OTP(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -78,4 +158,89 @@ class OTP(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_used = db.Column(db.Boolean, default=False)
 
+    __table_args__ = (
+        db.Index("ix_otp_phone_code", "phone", "code", "is_used"),
+        db.Index("ix_otp_phone_created_at", "phone", "created_at"),
+        db.Index("ix_otp_created_at", "created_at"),
+    )
+
+
+class StatCounter(db.Model):
+    """Running count per (metric, key), maintained by bluehire.stats."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(50), nullable=False)  # users_by_role, jobs_by_category, ...
+    key = db.Column(db.String(200), nullable=False, default="")
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (db.UniqueConstraint("metric", "key", name="uq_stat_counter_metric_key"),)
+
+
+class DailyStat(db.Model):
+    """Rows created per day for each entity, maintained by bluehire.stats."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    metric = db.Column(db.String(50), nullable=False)  # users, jobs, applications
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (db.UniqueConstraint("day", "metric", name="uq_daily_stat_day_metric"),)
+
+
+class Notification(db.Model):
+    """Outbox row, written in the same transaction as the event it reports."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)  # recipient
+    channel = db.Column(db.String(10), nullable=False)  # email, sms
+    kind = db.Column(db.String(50), nullable=False)  # new_application
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index("ix_notification_due", "status", "next_attempt_at"),)
+
+    user = db.relationship("User")
+
 
+class JobArchive(db.Model):
+    """A job moved out of ``job`` by bluehire.lifecycle; same columns as Job."""
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    category = db.Column(db.String(100), nullable=False)
+    location = db.Column(db.String(200), nullable=False)
+    skills_required = db.Column(db.String(255))
+    salary_min = db.Column(db.Integer)
+    salary_max = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime)
+    employer_id = db.Column(db.Integer, nullable=False)
+    external_ref = db.Column(db.String(100))
+    location_id = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False)
+    expires_at = db.Column(db.DateTime)
+    closed_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (db.Index("ix_job_archive_employer_id", "employer_id"),)
+
+
+class ApplicationArchive(db.Model):
+    """An application of an archived job; same columns as Application."""
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    worker_id = db.Column(db.Integer, nullable=False)
+    job_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(50))
+    applied_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_application_archive_job_id", "job_id"),
+        db.Index("ix_application_archive_worker_id", "worker_id"),
+    )
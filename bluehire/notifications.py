@@ -0,0 +1,215 @@
+"""Outbox-based notifications.
+
+Views call :func:`enqueue` before committing, so a notification row exists
+if and only if the event it describes was committed. ``flask
+dispatch-notifications`` drains the outbox in the background: due rows are
+claimed in batches, coalesced into one digest per recipient and channel,
+and handed to the configured transport on a thread pool. Failed sends are
+retried with exponential backoff until ``NOTIFY_MAX_ATTEMPTS``. Rows are
+claimed with a conditional ``UPDATE``, so concurrent dispatchers never send
+the same row twice. Notifications for deleted users are marked failed.
+While idle, the dispatcher deletes sent and failed rows older than
+``NOTIFY_RETENTION_DAYS``.
+
+Transports are chosen with ``NOTIFY_TRANSPORT``: ``"console"``, ``"file"``
+(appends JSON lines to ``NOTIFY_FILE``) or a ``"package.module:Class"``
+path to any class with a ``send(channel, address, subject, body)`` method.
+"""
+import importlib
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, delete, or_, select, update
+
+from bluehire import db
+from bluehire.models import Notification, User
+
+DEFAULTS = {
+    "NOTIFY_TRANSPORT": "console",
+    "NOTIFY_FILE": "notifications.jsonl",
+    "NOTIFY_CHANNELS": ("email", "sms"),
+    "NOTIFY_BATCH_SIZE": 200,
+    "NOTIFY_WORKERS": 4,
+    "NOTIFY_MAX_ATTEMPTS": 5,
+    # Seconds; doubled after every failed attempt.
+    "NOTIFY_BACKOFF": 30,
+    # Seconds a claimed row stays invisible to other passes while it is sent.
+    "NOTIFY_LEASE": 300,
+    "NOTIFY_RETENTION_DAYS": 30,
+    "NOTIFY_PRUNE_INTERVAL": 3600,
+    "NOTIFY_PRUNE_BATCH": 1000,
+}
+
+
+class ConsoleTransport:
+    def send(self, channel, address, subject, body):
+        print(f"[NOTIFY:{channel}] to={address} subject={subject!r}\n{body}")
+
+
+class FileTransport:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, channel, address, subject, body):
+        record = {
+            "channel": channel,
+            "to": address,
+            "subject": subject,
+            "body": body,
+            "sent_at": datetime.utcnow().isoformat(),
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+
+def load_transport(app):
+    name = app.config["NOTIFY_TRANSPORT"]
+    if name == "console":
+        return ConsoleTransport()
+    if name == "file":
+        return FileTransport(app.config["NOTIFY_FILE"])
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def _address(user, channel):
+    return user.phone if channel == "sms" else user.email
+
+
+def enqueue(user, kind, body):
+    """Add outbox rows for ``user`` to the current session (caller commits)."""
+    for channel in current_app.config["NOTIFY_CHANNELS"]:
+        if _address(user, channel):
+            db.session.add(Notification(user_id=user.id, channel=channel, kind=kind, body=body))
+
+
+def _claim(now):
+    """Mark a batch of due rows as ``sending`` and return the ones this pass won.
+
+    The ``UPDATE`` repeats the due condition, so a row another dispatcher
+    claimed in the meantime (its lease is in the future) is not taken again.
+    """
+    config = current_app.config
+    due = and_(Notification.status.in_(("pending", "sending")), Notification.next_attempt_at <= now)
+    ids = db.session.execute(
+        select(Notification.id)
+        .where(due)
+        .order_by(Notification.next_attempt_at)
+        .limit(config["NOTIFY_BATCH_SIZE"])
+    ).scalars().all()
+    if not ids:
+        return []
+    lease = now + timedelta(seconds=config["NOTIFY_LEASE"])
+    claim = (
+        update(Notification)
+        .values(status="sending", next_attempt_at=lease)
+        .execution_options(synchronize_session=False)
+    )
+    if db.engine.dialect.update_returning:
+        claimed = db.session.execute(
+            claim.where(due, Notification.id.in_(ids)).returning(Notification.id)
+        ).scalars().all()
+    else:
+        claimed = [row_id for row_id in ids if db.session.execute(claim.where(due, Notification.id == row_id)).rowcount]
+    db.session.commit()
+    if not claimed:
+        return []
+    return Notification.query.filter(Notification.id.in_(claimed)).order_by(Notification.next_attempt_at).all()
+
+
+def _digest(rows):
+    if len(rows) == 1:
+        return "BlueHire update", rows[0].body
+    lines = "\n".join(f"- {row.body}" for row in rows)
+    return f"BlueHire: {len(rows)} new updates", lines
+
+
+def dispatch_once(transport, pool):
+    """Send one batch of due notifications. Returns the number of rows handled."""
+    config = current_app.config
+    now = datetime.utcnow()
+    rows = _claim(now)
+    if not rows:
+        return 0
+
+    digests = defaultdict(list)
+    for row in rows:
+        digests[(row.user_id, row.channel)].append(row)
+    users = {user.id: user for user in User.query.filter(User.id.in_({uid for uid, _ in digests}))}
+
+    futures = {}
+    for (user_id, channel), batch in digests.items():
+        user = users.get(user_id)
+        if user is None:
+            for row in batch:
+                row.status = "failed"
+                row.last_error = "recipient no longer exists"
+            continue
+        subject, body = _digest(batch)
+        address = _address(user, channel)
+        futures[(user_id, channel)] = pool.submit(transport.send, channel, address, subject, body)
+    for key, future in futures.items():
+        error = future.exception()
+        for row in digests[key]:
+            if error is None:
+                row.status = "sent"
+                row.sent_at = datetime.utcnow()
+                continue
+            row.attempts += 1
+            row.last_error = repr(error)
+            if row.attempts >= config["NOTIFY_MAX_ATTEMPTS"]:
+                row.status = "failed"
+            else:
+                row.status = "pending"
+                delay = config["NOTIFY_BACKOFF"] * 2 ** (row.attempts - 1)
+                row.next_attempt_at = now + timedelta(seconds=delay)
+    db.session.commit()
+    return len(rows)
+
+
+def prune(now=None):
+    """Delete sent and failed rows older than ``NOTIFY_RETENTION_DAYS``, in batches."""
+    config = current_app.config
+    cutoff = (now or datetime.utcnow()) - timedelta(days=config["NOTIFY_RETENTION_DAYS"])
+    batch_size = config["NOTIFY_PRUNE_BATCH"]
+    old = or_(
+        and_(Notification.status == "sent", Notification.sent_at < cutoff),
+        and_(Notification.status == "failed", Notification.created_at < cutoff),
+    )
+    deleted = 0
+    while True:
+        ids = select(Notification.id).where(old).limit(batch_size)
+        result = db.session.execute(delete(Notification).where(Notification.id.in_(ids)))
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+def run_dispatcher(once=False, idle_sleep=2.0):
+    app = current_app._get_current_object()
+    transport = load_transport(app)
+    sent = 0
+    next_prune = 0.0
+    with ThreadPoolExecutor(max_workers=app.config["NOTIFY_WORKERS"]) as pool:
+        while True:
+            handled = dispatch_once(transport, pool)
+            sent += handled
+            if not handled and time.monotonic() >= next_prune:
+                prune()
+                next_prune = time.monotonic() + app.config["NOTIFY_PRUNE_INTERVAL"]
+            if once and not handled:
+                return sent
+            if not handled:
+                time.sleep(idle_sleep)
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
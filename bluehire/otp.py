@@ -0,0 +1,167 @@
+"""One-time password storage with expiry and per-phone throttling.
+
+``OTP_BACKEND`` selects the store: ``"sql"`` keeps codes in the ``otp``
+table (indexed on phone/code/is_used) and works across processes;
+``"memory"`` keeps them in a per-process dict and suits single-node
+deployments. Both expire codes after ``OTP_TTL`` seconds and refuse more
+than ``OTP_MAX_REQUESTS`` codes per phone per ``OTP_REQUEST_WINDOW``
+seconds. ``flask sweep-otps`` deletes expired and used rows in batches.
+"""
+import random
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+
+from bluehire import db
+from bluehire.models import OTP
+
+DEFAULTS = {
+    "OTP_BACKEND": "sql",
+    "OTP_TTL": 600,
+    "OTP_MAX_REQUESTS": 3,
+    "OTP_REQUEST_WINDOW": 600,
+    "OTP_SWEEP_BATCH": 1000,
+}
+
+
+class OTPThrottled(Exception):
+    """Raised when a phone has requested too many codes recently."""
+
+
+def _generate_code():
+    return f"{random.SystemRandom().randint(100000, 999999)}"
+
+
+class SQLOTPStore:
+    def __init__(self, ttl, max_requests, window):
+        self.ttl = timedelta(seconds=ttl)
+        self.max_requests = max_requests
+        self.window = timedelta(seconds=window)
+
+    def issue(self, phone):
+        now = datetime.utcnow()
+        recent = db.session.scalar(
+            select(func.count()).select_from(OTP).where(OTP.phone == phone, OTP.created_at > now - self.window)
+        )
+        if recent >= self.max_requests:
+            raise OTPThrottled()
+        code = _generate_code()
+        db.session.add(OTP(phone=phone, code=code, created_at=now))
+        db.session.commit()
+        return code
+
+    def verify(self, phone, code):
+        otp = (
+            OTP.query.filter_by(phone=phone, code=code, is_used=False)
+            .filter(OTP.created_at > datetime.utcnow() - self.ttl)
+            .order_by(OTP.created_at.desc())
+            .first()
+        )
+        if otp is None:
+            return False
+        # Conditional update so two concurrent submissions cannot both use it.
+        result = db.session.execute(
+            update(OTP).where(OTP.id == otp.id, OTP.is_used.is_(False)).values(is_used=True)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def sweep(self, batch_size):
+        """Delete used and expired rows ``batch_size`` at a time."""
+        now = datetime.utcnow()
+        # Used rows still count towards the request throttle until the
+        # window has passed.
+        stale = (OTP.is_used.is_(True) & (OTP.created_at < now - self.window)) | (
+            OTP.created_at < now - max(self.ttl, self.window)
+        )
+        deleted = 0
+        while True:
+            ids = select(OTP.id).where(stale).limit(batch_size)
+            result = db.session.execute(delete(OTP).where(OTP.id.in_(ids)))
+            db.session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
+
+
+class MemoryOTPStore:
+    def __init__(self, ttl, max_requests, window):
+        self.ttl = timedelta(seconds=ttl)
+        self.max_requests = max_requests
+        self.window = timedelta(seconds=window)
+        # phone -> {code: expires_at}, phone -> [request times]
+        self._codes = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+        self._next_sweep = datetime.utcnow() + self.ttl
+
+    def issue(self, phone):
+        now = datetime.utcnow()
+        # No external sweeper can reach this process's memory, so sweep
+        # inline once per TTL.
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.ttl
+            self.sweep()
+        with self._lock:
+            requests = [t for t in self._requests.get(phone, []) if t > now - self.window]
+            if len(requests) >= self.max_requests:
+                self._requests[phone] = requests
+                raise OTPThrottled()
+            requests.append(now)
+            self._requests[phone] = requests
+            code = _generate_code()
+            self._codes.setdefault(phone, {})[code] = now + self.ttl
+            return code
+
+    def verify(self, phone, code):
+        with self._lock:
+            codes = self._codes.get(phone, {})
+            expires_at = codes.pop(code, None)
+            if not codes:
+                self._codes.pop(phone, None)
+            return expires_at is not None and expires_at > datetime.utcnow()
+
+    def sweep(self, batch_size=None):
+        now = datetime.utcnow()
+        deleted = 0
+        with self._lock:
+            for phone in list(self._codes):
+                codes = self._codes[phone]
+                for code in [c for c, expires_at in codes.items() if expires_at <= now]:
+                    del codes[code]
+                    deleted += 1
+                if not codes:
+                    del self._codes[phone]
+            for phone in list(self._requests):
+                if all(t <= now - self.window for t in self._requests[phone]):
+                    del self._requests[phone]
+        return deleted
+
+
+BACKENDS = {"sql": SQLOTPStore, "memory": MemoryOTPStore}
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.extensions["otp"] = BACKENDS[app.config["OTP_BACKEND"]](
+        app.config["OTP_TTL"], app.config["OTP_MAX_REQUESTS"], app.config["OTP_REQUEST_WINDOW"]
+    )
+
+
+def get_store():
+    return current_app.extensions["otp"]
+
+
+def issue(phone):
+    return get_store().issue(phone)
+
+
+def verify(phone, code):
+    return get_store().verify(phone, code)
+
+
+def sweep():
+    return get_store().sweep(current_app.config["OTP_SWEEP_BATCH"])
@@ -0,0 +1,229 @@
+"""Response cache for the anonymous job listing.
+
+:func:`cached_response` serves ``main.index`` for anonymous visitors from a
+cache keyed by the normalized search parameters and page cursor. Every
+entry belongs to a *generation*; committing a session that inserted,
+updated or deleted a :class:`~bluehire.models.Job` starts a new generation,
+so no page older than the last job change is ever served. The ETag is the
+generation plus the key, so browsers revalidate with ``If-None-Match`` and
+get an empty 304 while nothing has changed.
+
+Backends (``PAGE_CACHE_BACKEND``):
+
+``"memory"``
+    Per-process LRU of ``PAGE_CACHE_SIZE`` pages. The generation is per
+    process too, so it only sees commits made by this process; it also
+    rolls over every ``PAGE_CACHE_TTL`` seconds, which bounds how long a
+    page (or a browser's 304) can miss job changes made by other workers
+    or CLI commands. Meant for a single process; use ``"filesystem"``
+    when several workers serve the site.
+``"filesystem"``
+    Pages and the generation live under ``PAGE_CACHE_DIR`` (relative to
+    the instance folder), shared by every worker on the host.
+``"none"``
+    Disables caching.
+
+Rows written with Core bulk inserts bypass the ORM; call :func:`invalidate`
+afterwards.
+"""
+import hashlib
+import os
+import secrets
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from bluehire.models import Job
+
+DEFAULTS = {
+    "PAGE_CACHE_BACKEND": "memory",
+    "PAGE_CACHE_SIZE": 512,
+    "PAGE_CACHE_TTL": 60,
+    "PAGE_CACHE_DIR": "page_cache",
+}
+
+
+class MemoryBackend:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Per-process prefix: ETags from a previous run or another worker
+        # never match this process's pages.
+        self._prefix = secrets.token_hex(4)
+        self._generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def generation(self):
+        # The time bucket is part of the generation (and so of the ETag):
+        # a browser revalidating after PAGE_CACHE_TTL always gets a fresh page.
+        bucket = int(time.time() // self.ttl) if self.ttl > 0 else 0
+        return f"{self._prefix}.{self._generation}.{bucket}"
+
+    def bump(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get(self, generation, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation or entry[1] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, generation, key, body):
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class FileSystemBackend:
+    """Pages as files; the generation is a random token replaced atomically.
+
+    A random token rather than a counter means two processes bumping at
+    the same time can never both write the same "next" value.
+    """
+
+    PRUNE_EVERY = 64
+
+    def __init__(self, directory, maxsize):
+        self.directory = directory
+        self.maxsize = maxsize
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write(self, name, data):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, self._path(name))
+
+    def generation(self):
+        try:
+            with open(self._path("GENERATION"), "rb") as fh:
+                return fh.read().decode()
+        except FileNotFoundError:
+            self.bump()
+            return self.generation()
+
+    def bump(self):
+        self._write("GENERATION", secrets.token_hex(8).encode())
+
+    def get(self, generation, key):
+        try:
+            with open(self._path(key + ".page"), "rb") as fh:
+                stored, _, body = fh.read().partition(b"\n")
+        except FileNotFoundError:
+            return None
+        return body if stored.decode() == generation else None
+
+    def set(self, generation, key, body):
+        self._write(key + ".page", generation.encode() + b"\n" + body)
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune()
+
+    def _prune(self):
+        pages = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".page")]
+        if len(pages) <= self.maxsize:
+            return
+        pages.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in pages[: len(pages) - self.maxsize]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    backend = app.config["PAGE_CACHE_BACKEND"]
+    if backend == "memory":
+        cache = MemoryBackend(app.config["PAGE_CACHE_SIZE"], app.config["PAGE_CACHE_TTL"])
+    elif backend == "filesystem":
+        directory = os.path.join(app.instance_path, app.config["PAGE_CACHE_DIR"])
+        cache = FileSystemBackend(directory, app.config["PAGE_CACHE_SIZE"])
+    elif backend == "none":
+        cache = None
+    else:
+        raise ValueError(f"Unknown PAGE_CACHE_BACKEND {backend!r}")
+    app.extensions["page_cache"] = cache
+
+
+def normalize(value):
+    """Collapse whitespace so equivalent searches share one cache entry."""
+    return " ".join((value or "").split())
+
+
+def invalidate():
+    """Start a new generation; every cached page becomes stale."""
+    cache = current_app.extensions.get("page_cache")
+    if cache is not None:
+        cache.bump()
+
+
+def cached_response(key, render):
+    """Return the response for ``key``, calling ``render()`` on a miss.
+
+    Only anonymous requests without pending flash messages are cached;
+    everything else renders normally.
+    """
+    cache = current_app.extensions.get("page_cache")
+    if cache is None or current_user.is_authenticated or session.get("_flashes"):
+        return render()
+
+    generation = cache.generation()
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()
+    etag = f"{generation}-{digest[:16]}"
+    if etag in request.if_none_match:
+        response = make_response("", 304)
+    else:
+        body = cache.get(generation, digest)
+        if body is None:
+            body = render().encode()
+            cache.set(generation, digest, body)
+        response = make_response(body)
+    response.set_etag(etag)
+    # Revalidate every time; the 304 makes that cheap.
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Cookie")
+    return response
+
+
+@event.listens_for(Session, "after_flush")
+def _note_job_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Job):
+            session.info["page_cache_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_generation(session):
+    # After commit, not flush: a request racing the transaction must not
+    # cache pre-commit rows under the new generation.
+    if not session.info.pop("page_cache_dirty", False):
+        return
+    try:
+        invalidate()
+    except RuntimeError:
+        pass
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_job_changes(session):
+    session.info.pop("page_cache_dirty", None)
@@ -0,0 +1,149 @@
+"""Keyset pagination for job listings.
+
+Pages are addressed by opaque cursors instead of offsets, so fetching page
+1000 costs the same index seek as page 1. Chronological listings seek on
+``(created_at, id)`` and salary-sorted ones on ``(salary_max, id)``;
+relevance-ranked search results page through the capped id window
+returned by :mod:`bluehire.search`.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from flask import current_app, request, url_for
+from sqlalchemy import and_, or_
+
+from bluehire.models import Job
+
+DEFAULT_PER_PAGE = 20
+
+
+@dataclass
+class Page:
+    items: list = field(default_factory=list)
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+def encode_cursor(data):
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Return the cursor payload, or None for a missing or tampered cursor."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def per_page():
+    return current_app.config.get("JOBS_PER_PAGE", DEFAULT_PER_PAGE)
+
+
+# Keyset orderings: column pairs, each walked in descending order. Salary
+# ordering only covers jobs that state a salary (the caller filters).
+ORDERINGS = {
+    "newest": (Job.created_at, Job.id),
+    "salary": (Job.salary_max, Job.id),
+}
+
+
+def _job_key(job, columns):
+    value = getattr(job, columns[0].key)
+    return [value.isoformat() if isinstance(value, datetime) else value, job.id]
+
+
+def _parse_key(data, columns):
+    try:
+        value, job_id = data["k"]
+        if columns[0] is Job.created_at:
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, int):
+            return None
+        return value, int(job_id)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def keyset_page(query, cursor=None, limit=None, ordering="newest"):
+    """Page ``query`` in descending ``ORDERINGS[ordering]``, seeking on that key."""
+    limit = limit or per_page()
+    first, second = columns = ORDERINGS[ordering]
+    data = decode_cursor(cursor) or {}
+    key = _parse_key(data, columns) if data.get("s", "newest") == ordering else None
+    backwards = key is not None and data.get("d") == "prev"
+
+    if key is not None:
+        value, job_id = key
+        if backwards:
+            query = query.filter(
+                or_(first > value, and_(first == value, second > job_id))
+            ).order_by(first.asc(), second.asc())
+        else:
+            query = query.filter(
+                or_(first < value, and_(first == value, second < job_id))
+            ).order_by(first.desc(), second.desc())
+    else:
+        query = query.order_by(first.desc(), second.desc())
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    page = Page(items=rows)
+    if rows:
+        if has_more or backwards:
+            page.next_cursor = encode_cursor({"k": _job_key(rows[-1], columns), "d": "next", "s": ordering})
+        if (has_more and backwards) or (key is not None and not backwards):
+            page.prev_cursor = encode_cursor({"k": _job_key(rows[0], columns), "d": "prev", "s": ordering})
+    return page
+
+
+def ranked_page(query, ranked_ids, cursor=None, limit=None):
+    """Page ``query`` in ``ranked_ids`` order.
+
+    ``ranked_ids`` is already capped by the search backend, so only the
+    matching ids and one page of rows are ever loaded.
+    """
+    limit = limit or per_page()
+    data = decode_cursor(cursor) or {}
+    try:
+        offset = max(int(data.get("o", 0)), 0)
+    except (TypeError, ValueError):
+        offset = 0
+
+    matching = {row.id for row in query.with_entities(Job.id).filter(Job.id.in_(ranked_ids))}
+    ordered = [job_id for job_id in ranked_ids if job_id in matching]
+    window = ordered[offset:offset + limit]
+
+    position = {job_id: i for i, job_id in enumerate(window)}
+    items = sorted(query.filter(Job.id.in_(window)).all(), key=lambda job: position[job.id]) if window else []
+
+    page = Page(items=items)
+    if offset + limit < len(ordered):
+        page.next_cursor = encode_cursor({"o": offset + limit})
+    if offset > 0:
+        page.prev_cursor = encode_cursor({"o": max(offset - limit, 0)})
+    return page
+
+
+def cursor_url(cursor):
+    """URL for the current listing at ``cursor``, keeping the search filters."""
+    args = request.args.to_dict()
+    args["cursor"] = cursor
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+
+def init_app(app):
+    app.config.setdefault("JOBS_PER_PAGE", DEFAULT_PER_PAGE)
+    app.add_template_global(cursor_url)
@@ -0,0 +1,119 @@
+"""Password hashing on a bounded process pool.
+
+Hashing and verification are CPU-bound, so they run on a per-process
+``ProcessPoolExecutor`` that uses every core instead of the request thread.
+At most ``PASSWORD_HASH_QUEUE`` operations may be queued or running at once;
+beyond that :class:`HashingOverloaded` is raised immediately so a login
+burst is shed instead of piling up.
+
+``PASSWORD_HASH_METHOD`` sets the Werkzeug algorithm and cost. Hashes made
+with other parameters still verify and are upgraded on the next successful
+login (see :func:`needs_rehash`). ``PASSWORD_FAST_HASH`` (or the
+:func:`fast_mode` context manager) switches to a cheap inline hash for
+seeding and tests.
+"""
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+from contextlib import contextmanager
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+FAST_METHOD = "pbkdf2:sha256:1000"
+
+_pool = None
+_pool_pid = None
+_slots = None
+_pool_lock = threading.Lock()
+_fast = threading.local()
+
+
+class HashingOverloaded(Exception):
+    """Raised when the hashing queue is full."""
+
+
+def _config(key, default):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def _fast_enabled():
+    return getattr(_fast, "enabled", False) or _config("PASSWORD_FAST_HASH", False)
+
+
+def current_method():
+    return FAST_METHOD if _fast_enabled() else _config("PASSWORD_HASH_METHOD", DEFAULT_METHOD)
+
+
+@contextmanager
+def fast_mode():
+    """Use the cheap hash for everything hashed in this block (this thread)."""
+    previous = getattr(_fast, "enabled", False)
+    _fast.enabled = True
+    try:
+        yield
+    finally:
+        _fast.enabled = previous
+
+
+def _executor():
+    global _pool, _pool_pid, _slots
+    workers = _config("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)
+    if not workers:
+        return None, None
+    with _pool_lock:
+        # Pools do not survive fork, so each gunicorn worker gets its own.
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(_config("PASSWORD_HASH_QUEUE", workers * 4))
+        return _pool, _slots
+
+
+def _run(fn, *args):
+    if _fast_enabled():
+        return fn(*args)
+    pool, slots = _executor()
+    if pool is None:
+        return fn(*args)
+    if not slots.acquire(blocking=False):
+        raise HashingOverloaded()
+    try:
+        future = pool.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    # Released when the work is done or cancelled, not when we stop waiting,
+    # so hashes that outlive their timeout still count against the queue.
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=_config("PASSWORD_HASH_TIMEOUT", 10))
+    except FuturesTimeout:
+        future.cancel()
+        raise HashingOverloaded() from None
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, current_method())
+
+
+def verify_password(pwhash, password):
+    # Hashes made in fast mode are cheap to check, so skip the pool for them.
+    if pwhash.startswith(FAST_METHOD + "$"):
+        return check_password_hash(pwhash, password)
+    return _run(check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash):
+    return pwhash.split("$", 1)[0] != current_method()
+
+
+@atexit.register
+def _shutdown():
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,150 @@
+"""EXPLAIN QUERY PLAN checks for the queries behind the hot routes.
+
+``flask check-query-plans`` compiles the statements the routes issue and
+fails if SQLite would answer any of them with a full table scan, or sort
+rows for an ORDER BY that an index should deliver in order, so a dropped
+or mis-ordered index is caught before deploy. Only SQLite plans are
+inspected; on other databases the check is skipped.
+
+``tests/test_query_plans.py`` runs the same check over the statements the
+routes execute through the test client, so a route whose query drifts
+from these is still caught.
+"""
+import re
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+
+from bluehire import db
+from bluehire.employer import routes as employer_routes
+from bluehire.models import OTP, Application, EmployerProfile, Job, User, WorkerProfile
+from bluehire.worker import routes as worker_routes
+
+# "SCAN job" / "SCAN TABLE job" with no index: a full table scan.
+_FULL_SCAN_RE = re.compile(r"^SCAN (TABLE )?\w+( AS \w+)?$")
+_SORT = "USE TEMP B-TREE FOR ORDER BY"
+# Statements whose ORDER BY may sort: radius searches span several cities,
+# a city's salary range is narrower than its newest-first walk, text
+# matches are capped, and an employer's few jobs are sorted after grouping.
+MAY_SORT = {
+    "main.index / worker.browse_jobs: jobs within a radius",
+    "main.index / worker.browse_jobs: city, minimum salary, newest",
+    "main.index / worker.browse_jobs: text matches, newest",
+    "employer.dashboard: jobs with application counts",
+}
+
+
+def statements():
+    now = datetime.utcnow()
+    newest = (Job.created_at.desc(), Job.id.desc())
+    by_salary = (Job.salary_max.desc(), Job.id.desc())
+    listed = select(Job).where(Job.status == "open")
+    return {
+        "auth.login: user by email": select(User).where(User.email == "someone@example.com"),
+        "auth.request_otp: throttle count": select(func.count())
+        .select_from(OTP)
+        .where(OTP.phone == "9000000000", OTP.created_at > now),
+        "auth.verify_otp: code lookup": select(OTP)
+        .where(OTP.phone == "9000000000", OTP.code == "123456", OTP.is_used.is_(False), OTP.created_at > now)
+        .order_by(OTP.created_at.desc())
+        .limit(1),
+        "worker: profile by user": select(WorkerProfile).where(WorkerProfile.user_id == 1),
+        "worker.dashboard: applications": worker_routes.dashboard_applications_query(1),
+        "worker.apply_job: duplicate check": select(Application).where(
+            Application.worker_id == 1, Application.job_id == 1
+        ),
+        "employer: profile by user": select(EmployerProfile).where(EmployerProfile.user_id == 1),
+        "employer.dashboard: jobs with application counts": employer_routes.dashboard_jobs_query(1),
+        "employer.view_applications: applications": select(Application).where(Application.job_id == 1),
+        "main.index / worker.browse_jobs: first page": listed
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(20),
+        "main.index / worker.browse_jobs: next page": listed
+        .where(or_(Job.created_at < now, and_(Job.created_at == now, Job.id < 100)))
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(21),
+        "main.index / worker.browse_jobs: jobs in a city": listed
+        .where(Job.location_id == 1)
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(21),
+        "main.index / worker.browse_jobs: jobs within a radius": listed
+        .where(Job.location_id.in_([1, 2, 3]))
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(21),
+        "main.index / worker.browse_jobs: posted within N days": listed
+        .where(Job.created_at >= now)
+        .order_by(*newest)
+        .limit(21),
+        "main.index / worker.browse_jobs: city, posted within N days": listed
+        .where(Job.location_id == 1, Job.created_at >= now)
+        .order_by(*newest)
+        .limit(21),
+        "main.index / worker.browse_jobs: minimum salary, newest": listed
+        .where(Job.salary_max >= 20000)
+        .order_by(*newest)
+        .limit(21),
+        "main.index / worker.browse_jobs: city, minimum salary, newest": listed
+        .where(Job.location_id == 1, Job.salary_max >= 20000)
+        .order_by(*newest)
+        .limit(21),
+        "main.index / worker.browse_jobs: text matches, newest": listed
+        .where(Job.id.in_([1, 2, 3]))
+        .order_by(*newest)
+        .limit(21),
+        "main.index / worker.browse_jobs: by salary": listed
+        .where(Job.salary_max.is_not(None))
+        .order_by(*by_salary)
+        .limit(21),
+        "main.index / worker.browse_jobs: minimum salary, by salary": listed
+        .where(Job.salary_max >= 20000, Job.salary_min <= 40000)
+        .order_by(*by_salary)
+        .limit(21),
+        "main.index / worker.browse_jobs: city, minimum salary, by salary": listed
+        .where(Job.location_id == 1, Job.salary_max >= 20000)
+        .order_by(*by_salary)
+        .limit(21),
+        "main.index / worker.browse_jobs: city, by salary, next page": listed
+        .where(
+            Job.location_id == 1,
+            Job.salary_max.is_not(None),
+            or_(Job.salary_max < 30000, and_(Job.salary_max == 30000, Job.id < 100)),
+        )
+        .order_by(*by_salary)
+        .limit(21),
+        "lifecycle.expire: jobs past expiry": select(Job)
+        .where(Job.status == "open", Job.expires_at <= now)
+        .order_by(Job.expires_at)
+        .limit(500),
+        "lifecycle.archive: next batch": select(Job.id)
+        .where(Job.status != "open", Job.closed_at < now)
+        .order_by(Job.closed_at)
+        .limit(500),
+        "lifecycle.archive: applications of a batch": select(Application.id).where(Application.job_id.in_([1, 2])),
+    }
+
+
+def explain(conn, statement, parameters=None):
+    """Plan lines for a statement, or for driver-level SQL and its parameters."""
+    if isinstance(statement, str):
+        sql = statement
+    else:
+        sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, parameters or ())]
+
+
+def is_bad(plan, may_sort=False):
+    """True if ``plan`` scans a whole table, or sorts when ``may_sort`` is false."""
+    return any(_FULL_SCAN_RE.match(line) for line in plan) or (not may_sort and _SORT in plan)
+
+
+def check():
+    """Return ``[(name, plan_lines), ...]`` for statements that scan a table or sort."""
+    failures = []
+    with db.engine.connect() as conn:
+        if conn.dialect.name != "sqlite":
+            return failures
+        for name, statement in statements().items():
+            plan = explain(conn, statement)
+            if is_bad(plan, may_sort=name in MAY_SORT):
+                failures.append((name, plan))
+    return failures
@@ -0,0 +1,253 @@
+"""Token-bucket rate limits for login, OTP and apply endpoints.
+
+Views decorated with :func:`limit` take one token from a bucket per client
+IP and one per account (the email, phone or user the request is about)
+before the view runs. Both buckets are checked before either is taken
+from, so a request rejected by one costs nothing from the other. Rates are configured as ``"<requests>/<period>"`` in
+``RATELIMIT_<NAME>_PER_IP`` and ``RATELIMIT_<NAME>_PER_ACCOUNT``, where
+the period is ``second``, ``minute``, ``hour``, ``day`` or a number of
+seconds; a bucket holds that many requests and refills evenly over the
+period. An empty rate disables that bucket.
+
+The IP is ``request.remote_addr``; behind a reverse proxy set
+``TRUSTED_PROXIES`` so it is the client's address, not the proxy's.
+
+A rejected request is answered with ``429 Too Many Requests`` and a
+``Retry-After`` header from the request data alone: no template, no
+database query and no password hash.
+
+Backends (``RATELIMIT_BACKEND``):
+
+``"memory"``
+    Per-process buckets in ``RATELIMIT_SHARDS`` independently locked
+    shards. Buckets are refilled lazily when next used, and the least
+    recently used ones are evicted beyond ``RATELIMIT_MAX_KEYS``.
+``"sqlite"``
+    Buckets in a separate SQLite file (``RATELIMIT_SQLITE_PATH``, relative
+    to the instance folder) shared by every worker on the host. Buckets
+    that have refilled completely are deleted now and then.
+``"none"``
+    Disables rate limiting.
+"""
+import itertools
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request, session
+from werkzeug.exceptions import TooManyRequests
+
+DEFAULTS = {
+    "RATELIMIT_BACKEND": "memory",
+    "RATELIMIT_SHARDS": 16,
+    "RATELIMIT_MAX_KEYS": 100000,
+    "RATELIMIT_SQLITE_PATH": "ratelimit.sqlite",
+    "RATELIMIT_LOGIN_PER_IP": "30/minute",
+    "RATELIMIT_LOGIN_PER_ACCOUNT": "10/minute",
+    "RATELIMIT_REQUEST_OTP_PER_IP": "10/minute",
+    "RATELIMIT_REQUEST_OTP_PER_ACCOUNT": "3/minute",
+    "RATELIMIT_VERIFY_OTP_PER_IP": "30/minute",
+    "RATELIMIT_VERIFY_OTP_PER_ACCOUNT": "5/minute",
+    "RATELIMIT_APPLY_JOB_PER_IP": "120/minute",
+    "RATELIMIT_APPLY_JOB_PER_ACCOUNT": "30/minute",
+}
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+SCOPES = ("ip", "account")
+
+
+def parse_rate(value):
+    """``(capacity, tokens per second)`` for a rate such as ``"10/minute"``."""
+    count, _, period = str(value).partition("/")
+    period = period.strip()
+    try:
+        capacity = int(count)
+        seconds = PERIODS[period] if period in PERIODS else float(period)
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid rate {value!r}")
+    if capacity < 1 or seconds <= 0:
+        raise ValueError(f"Invalid rate {value!r}")
+    return capacity, capacity / seconds
+
+
+def _take(levels, buckets, now):
+    """Refill buckets up to ``now`` and take a token from each if all have one.
+
+    ``levels`` holds the stored ``(tokens, updated)`` of each of ``buckets``,
+    which are ``(key, capacity, rate)``. Returns the new token counts and
+    the seconds to wait, 0 if allowed.
+    """
+    tokens = [
+        min(capacity, level + (now - updated) * rate)
+        for (level, updated), (_, capacity, rate) in zip(levels, buckets)
+    ]
+    wait = max(((1 - level) / rate for level, (_, _, rate) in zip(tokens, buckets) if level < 1), default=0)
+    if wait:
+        return tokens, wait
+    return [level - 1 for level in tokens], 0
+
+
+class MemoryStore:
+    def __init__(self, shards, max_keys):
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self._max_per_shard = max(1, max_keys // shards)
+
+    def take(self, buckets):
+        now = time.monotonic()
+        shards = [self._shards[hash(key) % len(self._shards)] for key, _, _ in buckets]
+        # Locked in a fixed order, so two requests cannot deadlock.
+        locks = sorted({id(lock): lock for lock, _ in shards}.items())
+        for _, lock in locks:
+            lock.acquire()
+        try:
+            levels = [shard.get(key, (capacity, now)) for (_, shard), (key, capacity, _) in zip(shards, buckets)]
+            tokens, wait = _take(levels, buckets, now)
+            for (_, shard), (key, _, _), level in zip(shards, buckets, tokens):
+                # Popped and re-inserted, so the shard stays in LRU order.
+                shard.pop(key, None)
+                shard[key] = (level, now)
+                while len(shard) > self._max_per_shard:
+                    shard.popitem(last=False)
+        finally:
+            for _, lock in locks:
+                lock.release()
+        return wait
+
+    def __len__(self):
+        return sum(len(buckets) for _, buckets in self._shards)
+
+
+class SQLiteStore:
+    """Buckets in their own SQLite file, one connection per thread.
+
+    Wall-clock time, since the buckets are shared between processes.
+    Durability does not matter here: losing the file only resets limits.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = itertools.count(1)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS bucket ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def take(self, buckets):
+        now = time.time()
+        conn = self._connection()
+        # IMMEDIATE takes the write lock up front, so concurrent workers
+        # serialize instead of both reading the same token count.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = [
+                conn.execute("SELECT tokens, updated FROM bucket WHERE key = ?", (key,)).fetchone()
+                or (capacity, now)
+                for key, capacity, _ in buckets
+            ]
+            tokens, wait = _take(levels, buckets, now)
+            conn.executemany(
+                "INSERT OR REPLACE INTO bucket (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                [
+                    (key, level, now, now + (capacity - level) / rate)
+                    for (key, capacity, rate), level in zip(buckets, tokens)
+                ],
+            )
+            if next(self._calls) % self.PRUNE_EVERY == 0:
+                # A full bucket is the same as no bucket.
+                conn.execute("DELETE FROM bucket WHERE full_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+class RateLimiter:
+    def __init__(self, store, rates):
+        self.store = store
+        # (name, scope) -> (capacity, tokens per second), or None if disabled.
+        self.rates = rates
+
+    def wait(self, name, ip, account):
+        """Seconds until the client may retry, 0 if the request may proceed."""
+        buckets = []
+        for scope, value in (("ip", ip), ("account", account)):
+            rate = self.rates.get((name, scope))
+            if rate is not None and value:
+                buckets.append((f"{name}:{scope}:{value}", *rate))
+        return self.store.take(buckets) if buckets else 0
+
+
+def _rates(config):
+    rates = {}
+    for key, value in config.items():
+        for scope in SCOPES:
+            suffix = f"_PER_{scope.upper()}"
+            if key.startswith("RATELIMIT_") and key.endswith(suffix):
+                name = key[len("RATELIMIT_"):-len(suffix)].lower()
+                rates[(name, scope)] = parse_rate(value) if value else None
+    return rates
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    backend = app.config["RATELIMIT_BACKEND"]
+    if backend == "memory":
+        store = MemoryStore(app.config["RATELIMIT_SHARDS"], app.config["RATELIMIT_MAX_KEYS"])
+    elif backend == "sqlite":
+        os.makedirs(app.instance_path, exist_ok=True)
+        store = SQLiteStore(os.path.join(app.instance_path, app.config["RATELIMIT_SQLITE_PATH"]))
+    elif backend == "none":
+        store = None
+    else:
+        raise ValueError(f"Unknown RATELIMIT_BACKEND {backend!r}")
+    app.extensions["ratelimit"] = RateLimiter(store, _rates(app.config)) if store is not None else None
+
+
+def form_value(field):
+    """Account key from a form field, e.g. the email on the login form."""
+    return lambda: (request.form.get(field) or "").strip().lower()
+
+
+def session_value(key):
+    """Account key from the session, e.g. the phone awaiting an OTP."""
+    return lambda: session.get(key)
+
+
+def limit(name, account=None, methods=("POST",)):
+    """Answer 429 once a client exceeds the ``name`` rate limits.
+
+    ``account`` returns the account the request is about, or a false value
+    to skip the per-account bucket. Only requests in ``methods`` count.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            limiter = current_app.extensions.get("ratelimit")
+            if limiter is not None and request.method in methods:
+                wait = limiter.wait(name, request.remote_addr, account() if account else None)
+                if wait:
+                    raise TooManyRequests(retry_after=math.ceil(wait))
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
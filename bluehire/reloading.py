@@ -0,0 +1,34 @@
+"""Single-flight periodic reloads for the per-process in-memory indexes.
+
+The matching and autocomplete indexes are rebuilt from the database every
+few minutes, inside whichever request notices they are stale. A rebuild
+scans whole tables, so :func:`reload_if_stale` lets only one thread do
+it: the others keep answering from the stale index instead of each
+building their own copy. Only the very first load, when there is nothing
+to serve yet, makes the other threads wait for it.
+"""
+import time
+
+
+def is_stale(index, interval):
+    return index.loaded_at is None or time.monotonic() - index.loaded_at > interval
+
+
+def reload_if_stale(index, interval, load):
+    """Call ``load()`` if ``index.loaded_at`` is older than ``interval`` seconds.
+
+    ``index`` has ``loaded_at`` (set by ``load``) and a ``reload_lock``.
+    Returns True if this call did the reload.
+    """
+    if not is_stale(index, interval):
+        return False
+    if not index.reload_lock.acquire(blocking=index.loaded_at is None):
+        return False
+    try:
+        # Another thread may have finished a reload while this one waited.
+        if not is_stale(index, interval):
+            return False
+        load()
+        return True
+    finally:
+        index.reload_lock.release()
@@ -0,0 +1,154 @@
+"""Read replicas for read-only views.
+
+With ``DB_REPLICA_URIS`` set (see :mod:`bluehire.database`), views marked
+:func:`read_only` (the job listings and the dashboards) run their queries
+on a replica, picked round-robin among the healthy ones. Everything else
+uses the primary:
+
+* other views, CLI commands and scripts;
+* a session's flushes and ``INSERT``/``UPDATE``/``DELETE`` statements, and
+  every statement after them in the same session;
+* for ``DB_READ_YOUR_WRITES_SECONDS`` after a request that wrote, the same
+  browser's requests (a short-lived cookie), so the redirect after
+  ``apply_job`` or ``create_job`` shows the new row even if the replicas
+  are behind.
+
+A replica is checked with a cheap query at most every
+``DB_REPLICA_CHECK_INTERVAL`` seconds, and immediately taken out of the
+rotation when one of its connections fails; the request that hit the
+failure still fails. With no healthy replica, reads go to the primary.
+
+Anonymous listing pages rendered from a lagging replica can stay in the
+page cache until its TTL or the next job change.
+
+Locally, copies of a SQLite database work as replicas; ``flask
+sync-replicas`` refreshes them from the primary.
+"""
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql.dml import UpdateBase
+
+DEFAULTS = {
+    "DB_REPLICA_CHECK_INTERVAL": 10,
+    "DB_READ_YOUR_WRITES_SECONDS": 5,
+}
+
+# Set on responses to requests that wrote; its presence pins reads to the primary.
+PRIMARY_COOKIE = "db_primary"
+
+
+class RoutingSession(Session):
+    """``db.session``: reads on ``g.db_replica`` if a read-only view chose one."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get("wrote"):
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info["wrote"] = True
+                if has_request_context():
+                    g.db_wrote = True
+            elif has_app_context() and g.get("db_replica") is not None:
+                return g.db_replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.healthy = True
+        self.check_at = 0.0
+        self.lock = threading.Lock()
+
+
+class ReplicaSet:
+    def __init__(self, engines, check_interval):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.check_interval = check_interval
+        self._turn = itertools.count()
+        for replica in self.replicas:
+            event.listen(replica.engine, "handle_error", self._failed(replica))
+
+    def _failed(self, replica):
+        def handle_error(context):
+            replica.healthy = False
+            replica.check_at = time.monotonic() + self.check_interval
+
+        return handle_error
+
+    def _check(self, replica):
+        now = time.monotonic()
+        # One thread checks; the others go by the last result meanwhile.
+        if now < replica.check_at or not replica.lock.acquire(blocking=False):
+            return replica.healthy
+        try:
+            with replica.engine.connect() as conn:
+                # Not just SELECT 1: an empty or unmigrated copy is not a replica.
+                conn.execute(text("SELECT 1 FROM schema_version LIMIT 1"))
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+        finally:
+            replica.check_at = time.monotonic() + self.check_interval
+            replica.lock.release()
+        return replica.healthy
+
+    def choose(self):
+        """The next healthy replica's engine, or ``None``."""
+        start = next(self._turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self._check(replica):
+                return replica.engine
+        return None
+
+
+def init_app(app):
+    from bluehire import database, db
+
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    with app.app_context():
+        engines = [
+            engine for key, engine in db.engines.items()
+            if key is not None and key.startswith(database.REPLICA_BIND_PREFIX)
+        ]
+    app.extensions["replicas"] = ReplicaSet(engines, app.config["DB_REPLICA_CHECK_INTERVAL"]) if engines else None
+    app.after_request(_pin_to_primary)
+
+
+def _pin_to_primary(response):
+    if g.get("db_wrote"):
+        response.set_cookie(
+            PRIMARY_COOKIE, "1", max_age=current_app.config["DB_READ_YOUR_WRITES_SECONDS"],
+            httponly=True, samesite="Lax",
+        )
+    return response
+
+
+def read_only(func):
+    """Run the view's queries on a replica when one is available."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        replicas = current_app.extensions.get("replicas")
+        if replicas is not None and PRIMARY_COOKIE not in request.cookies:
+            g.db_replica = replicas.choose()
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def sync_sqlite(primary, replica):
+    """Copy the primary SQLite database over a replica file, consistently."""
+    source = primary.raw_connection()
+    target = replica.raw_connection()
+    try:
+        source.driver_connection.backup(target.driver_connection)
+    finally:
+        target.close()
+        source.close()
@@ -0,0 +1,288 @@
+"""Full-text job search.
+
+Open jobs are indexed over title, skills, category, location and
+description; closing or expiring a job removes it.
+On SQLite builds with FTS5 the index is a ``job_fts`` virtual table written
+in the same transaction as the ``job`` row; everywhere else an in-process
+inverted index is used instead. Changes are applied once per flush, so a
+batch of jobs committed together is indexed with one statement.
+
+``flask db-upgrade`` creates the ``job_fts`` table; the app picks its
+backend on first use (FTS5 if that table exists) rather than at startup.
+"""
+import bisect
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from heapq import nlargest
+
+from flask import current_app
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from bluehire import db
+from bluehire.models import Job
+
+SEARCH_FIELDS = ("title", "skills_required", "category", "location", "description")
+# Relative weight of a hit in each of SEARCH_FIELDS, used by both backends.
+FIELD_WEIGHTS = (10.0, 8.0, 4.0, 2.0, 1.0)
+# Upper bound on the number of ranked ids a single search returns.
+RESULT_CAP = 500
+
+_backend_lock = threading.Lock()
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_JOB_COLUMNS = ", ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+
+
+def tokenize(value):
+    return _TOKEN_RE.findall((value or "").lower())
+
+
+def _job_rows(jobs):
+    return [
+        {"id": job.id, **{field: getattr(job, field) or "" for field in SEARCH_FIELDS}}
+        for job in jobs
+    ]
+
+
+class FTS5Backend:
+    name = "fts5"
+
+    def create(self, conn):
+        conn.execute(
+            text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS job_fts USING fts5("
+                + ", ".join(SEARCH_FIELDS)
+                + ", tokenize='unicode61 remove_diacritics 2')"
+            )
+        )
+
+    def add(self, conn, rows):
+        if not rows:
+            return
+        self.remove(conn, [row["id"] for row in rows])
+        conn.execute(
+            text(
+                "INSERT INTO job_fts(rowid, " + ", ".join(SEARCH_FIELDS) + ") VALUES (:id, "
+                + ", ".join(f":{field}" for field in SEARCH_FIELDS)
+                + ")"
+            ),
+            rows,
+        )
+
+    def remove(self, conn, job_ids):
+        if job_ids:
+            conn.execute(text("DELETE FROM job_fts WHERE rowid = :id"), [{"id": i} for i in job_ids])
+
+    def rebuild(self, conn):
+        conn.execute(text("DELETE FROM job_fts"))
+        conn.execute(
+            text(
+                "INSERT INTO job_fts(rowid, " + ", ".join(SEARCH_FIELDS) + ") "
+                f"SELECT id, {_JOB_COLUMNS} FROM job WHERE status = 'open'"
+            )
+        )
+
+    def search(self, conn, q, limit):
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        match = " ".join(f'"{token}"*' for token in tokens)
+        weights = ", ".join(str(w) for w in FIELD_WEIGHTS)
+        rows = conn.execute(
+            text(
+                "SELECT rowid FROM job_fts WHERE job_fts MATCH :match "
+                f"ORDER BY bm25(job_fts, {weights}) LIMIT :limit"
+            ),
+            {"match": match, "limit": limit},
+        )
+        return [row[0] for row in rows]
+
+
+class InvertedIndexBackend:
+    """Token -> {job_id: weighted term frequency}, kept per process.
+
+    The index is loaded from the ``job`` table on first use and updated from
+    the same flush hook that keeps the FTS5 table in sync.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._postings = defaultdict(dict)
+        self._doc_tokens = {}
+        self._vocab = []
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def create(self, conn):
+        pass
+
+    def _index(self, row):
+        self._unindex(row["id"])
+        tf = Counter()
+        for field, weight in zip(SEARCH_FIELDS, FIELD_WEIGHTS):
+            for token in tokenize(row[field]):
+                tf[token] += weight
+        for token, score in tf.items():
+            postings = self._postings[token]
+            if not postings:
+                bisect.insort(self._vocab, token)
+            postings[row["id"]] = score
+        self._doc_tokens[row["id"]] = tuple(tf)
+
+    def _unindex(self, job_id):
+        for token in self._doc_tokens.pop(job_id, ()):
+            postings = self._postings[token]
+            postings.pop(job_id, None)
+            if not postings:
+                del self._postings[token]
+                i = bisect.bisect_left(self._vocab, token)
+                if i < len(self._vocab) and self._vocab[i] == token:
+                    del self._vocab[i]
+
+    def add(self, conn, rows):
+        with self._lock:
+            if self._loaded:
+                for row in rows:
+                    self._index(row)
+
+    def remove(self, conn, job_ids):
+        with self._lock:
+            for job_id in job_ids:
+                self._unindex(job_id)
+
+    def rebuild(self, conn):
+        with self._lock:
+            self._postings.clear()
+            self._doc_tokens.clear()
+            self._vocab.clear()
+            result = conn.execution_options(yield_per=5000).execute(
+                text(f"SELECT id, {_JOB_COLUMNS} FROM job WHERE status = 'open'")
+            )
+            for row in result:
+                self._index(dict(zip(("id",) + SEARCH_FIELDS, row)))
+            self._loaded = True
+
+    def _expand(self, prefix):
+        start = bisect.bisect_left(self._vocab, prefix)
+        end = bisect.bisect_left(self._vocab, prefix + "\uffff")
+        return self._vocab[start:end]
+
+    def search(self, conn, q, limit):
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        with self._lock:
+            if not self._loaded:
+                self.rebuild(conn)
+            total = max(len(self._doc_tokens), 1)
+            scores = None
+            for token in tokens:
+                token_scores = defaultdict(float)
+                for term in self._expand(token):
+                    postings = self._postings[term]
+                    idf = math.log(1 + total / len(postings))
+                    for job_id, tf in postings.items():
+                        token_scores[job_id] += tf * idf
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {i: s + token_scores[i] for i, s in scores.items() if i in token_scores}
+                if not scores:
+                    return []
+            return [job_id for job_id, _ in nlargest(limit, scores.items(), key=lambda item: item[1])]
+
+
+def _fts5_available(conn):
+    if conn.dialect.name != "sqlite":
+        return False
+    try:
+        conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)"))
+        conn.execute(text("DROP TABLE temp.fts5_probe"))
+    except OperationalError:
+        return False
+    return True
+
+
+def detect_backend(conn):
+    """The backend this database supports, for creating the index."""
+    return FTS5Backend() if _fts5_available(conn) else InvertedIndexBackend()
+
+
+def _has_fts_table(conn):
+    if conn.dialect.name != "sqlite":
+        return False
+    return conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'job_fts'")).first() is not None
+
+
+def init_app(app):
+    # Chosen on first use, so creating the app never touches the database.
+    app.extensions["search"] = None
+
+
+def get_backend(conn=None):
+    backend = current_app.extensions["search"]
+    if backend is None:
+        with _backend_lock:
+            backend = current_app.extensions["search"]
+            if backend is None:
+                conn = conn if conn is not None else db.session.connection()
+                backend = FTS5Backend() if _has_fts_table(conn) else InvertedIndexBackend()
+                current_app.extensions["search"] = backend
+    return backend
+
+
+def ranked_job_ids(q, limit=RESULT_CAP):
+    """Return ids of jobs matching ``q``, best match first."""
+    return get_backend().search(db.session.connection(), q, limit)
+
+
+def index_jobs(jobs):
+    """Index jobs written outside the ORM unit of work (e.g. Core bulk inserts)."""
+    get_backend().add(db.session.connection(), _job_rows(jobs))
+
+
+def rebuild_index():
+    backend = get_backend()
+    with db.engine.begin() as conn:
+        backend.rebuild(conn)
+    return backend
+
+
+def _search_enabled():
+    try:
+        return "search" in current_app.extensions
+    except RuntimeError:
+        return False
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_index(session, flush_context):
+    """Apply a flush's job inserts, edits and deletes to the index in one go."""
+    if not _search_enabled():
+        return
+    changed = [job for job in session.new if isinstance(job, Job) and job.status == "open"]
+    removed = [job.id for job in session.deleted if isinstance(job, Job)]
+    for job in session.dirty:
+        if not isinstance(job, Job) or not _search_fields_changed(job):
+            continue
+        if job.status == "open":
+            changed.append(job)
+        else:
+            removed.append(job.id)
+    if not changed and not removed:
+        return
+    conn = session.connection()
+    backend = get_backend(conn)
+    backend.remove(conn, removed)
+    backend.add(conn, _job_rows(changed))
+
+
+def _search_fields_changed(job):
+    # A status change adds the job to or removes it from the index.
+    attrs = inspect(job).attrs
+    return any(attrs[field].history.has_changes() for field in (*SEARCH_FIELDS, "status"))
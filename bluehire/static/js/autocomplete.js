@@ -0,0 +1,50 @@
+// Suggestions for inputs marked with data-autocomplete="skill|category|city".
+// Uses a native <datalist>, debounces keystrokes and cancels stale requests.
+
+(function () {
+  const url = document.currentScript.dataset.url;
+  const DELAY_MS = 120;
+
+  function attach(input, index) {
+    const list = document.createElement("datalist");
+    list.id = `autocomplete-${index}`;
+    input.setAttribute("list", list.id);
+    input.after(list);
+
+    let timer = null;
+    let controller = null;
+    const cache = new Map();
+
+    function show(values) {
+      list.replaceChildren(...values.map((value) => new Option(value)));
+    }
+
+    input.addEventListener("input", () => {
+      clearTimeout(timer);
+      const q = input.value.trim();
+      if (!q) {
+        show([]);
+        return;
+      }
+      const key = q.toLowerCase();
+      if (cache.has(key)) {
+        show(cache.get(key));
+        return;
+      }
+      timer = setTimeout(() => {
+        if (controller) controller.abort();
+        controller = new AbortController();
+        const params = new URLSearchParams({ kind: input.dataset.autocomplete, q });
+        fetch(`${url}?${params}`, { signal: controller.signal })
+          .then((response) => (response.ok ? response.json() : []))
+          .then((values) => {
+            cache.set(key, values);
+            show(values);
+          })
+          .catch(() => {});
+      }, DELAY_MS);
+    });
+  }
+
+  document.querySelectorAll("input[data-autocomplete]").forEach(attach);
+})();
@@ -0,0 +1,192 @@
+"""Incrementally maintained counters for the admin dashboard.
+
+Every flush that inserts, updates or deletes a User, Job or Application
+adjusts the matching ``stat_counter`` and ``daily_stat`` rows in the same
+transaction, so the dashboard reads a handful of integers instead of the
+whole database. Rows written with Core bulk inserts bypass the ORM; run
+``flask reconcile-stats`` afterwards to recompute everything with COUNT(*).
+"""
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam, event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from bluehire import db
+from bluehire.models import Application, DailyStat, Job, StatCounter, User
+
+# metric -> (model, grouped attribute)
+COUNTERS = {
+    "users_by_role": (User, "role"),
+    "jobs_by_category": (Job, "category"),
+    "jobs_by_city": (Job, "location"),
+    "applications_by_status": (Application, "status"),
+}
+
+# metric -> (model, creation timestamp attribute)
+DAILY = {
+    "users": (User, "created_at"),
+    "jobs": (Job, "created_at"),
+    "applications": (Application, "applied_at"),
+}
+
+_TRACKED = tuple({model for model, _ in COUNTERS.values()})
+
+
+def _old_value(obj, attr):
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+
+def _collect(session):
+    counters = Counter()
+    daily = Counter()
+    for obj in session.new:
+        if isinstance(obj, _TRACKED):
+            for metric, (model, attr) in COUNTERS.items():
+                if isinstance(obj, model):
+                    counters[(metric, getattr(obj, attr) or "")] += 1
+            for metric, (model, attr) in DAILY.items():
+                if isinstance(obj, model):
+                    daily[((getattr(obj, attr) or datetime.utcnow()).date(), metric)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, _TRACKED):
+            for metric, (model, attr) in COUNTERS.items():
+                if isinstance(obj, model):
+                    counters[(metric, _old_value(obj, attr) or "")] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, _TRACKED):
+            for metric, (model, attr) in COUNTERS.items():
+                if isinstance(obj, model):
+                    history = inspect(obj).attrs[attr].history
+                    if history.has_changes() and history.deleted:
+                        counters[(metric, history.deleted[0] or "")] -= 1
+                        counters[(metric, getattr(obj, attr) or "")] += 1
+    return counters, daily
+
+
+_UPSERTS = {}
+
+
+def _upsert_statement(dialect, model, key_names):
+    cache_key = (dialect, model)
+    stmt = _UPSERTS.get(cache_key)
+    if stmt is None:
+        table = model.__table__
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(table).values({name: bindparam(name) for name in (*key_names, "value")})
+        stmt = _UPSERTS[cache_key] = stmt.on_conflict_do_update(
+            index_elements=list(key_names), set_={"value": table.c.value + stmt.excluded.value}
+        )
+    return stmt
+
+
+def _upsert(conn, model, rows):
+    """Add each row's ``value`` to the counter identified by its other keys."""
+    if not rows:
+        return
+    key_names = [name for name in rows[0] if name != "value"]
+    dialect = conn.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        # One prepared statement, executed as a batch.
+        conn.execute(_upsert_statement(dialect, model, key_names), rows)
+        return
+    table = model.__table__
+    for row in rows:
+        where = [table.c[name] == row[name] for name in key_names]
+        updated = conn.execute(table.update().where(*where).values(value=table.c.value + row["value"]))
+        if not updated.rowcount:
+            conn.execute(table.insert().values(**row))
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_deltas(session, flush_context):
+    counters, daily = _collect(session)
+    if not counters and not daily:
+        return
+    conn = session.connection()
+    _upsert(
+        conn,
+        StatCounter,
+        [{"metric": metric, "key": str(key), "value": delta} for (metric, key), delta in counters.items() if delta],
+    )
+    _upsert(
+        conn,
+        DailyStat,
+        [{"day": day, "metric": metric, "value": delta} for (day, metric), delta in daily.items()],
+    )
+
+
+def discount(conn, model, where):
+    """Subtract the ``model`` rows matching ``where`` from the counters.
+
+    For Core deletes, which bypass the flush hook. Daily creation counts
+    are history and are left alone.
+    """
+    for metric, (counted, attr) in COUNTERS.items():
+        if counted is not model:
+            continue
+        column = getattr(model, attr)
+        rows = conn.execute(select(column, func.count()).where(where).group_by(column))
+        _upsert(conn, StatCounter, [{"metric": metric, "key": str(key or ""), "value": -count} for key, count in rows])
+
+
+def reconcile(conn=None):
+    """Recompute every counter from the source tables with COUNT(*).
+
+    With ``conn`` (a migration's connection) the caller commits; otherwise
+    the session is committed.
+    """
+    if conn is None:
+        _recompute(db.session.connection())
+        db.session.commit()
+    else:
+        _recompute(conn)
+
+
+def _recompute(conn):
+    conn.execute(StatCounter.__table__.delete())
+    conn.execute(DailyStat.__table__.delete())
+    for metric, (model, attr) in COUNTERS.items():
+        column = getattr(model, attr)
+        totals = Counter()
+        for key, count in conn.execute(select(column, func.count()).group_by(column)):
+            totals[str(key or "")] += count
+        if totals:
+            conn.execute(
+                StatCounter.__table__.insert(),
+                [{"metric": metric, "key": key, "value": count} for key, count in totals.items()],
+            )
+    for metric, (model, attr) in DAILY.items():
+        day = func.date(getattr(model, attr))
+        rows = [
+            {"day": date.fromisoformat(str(d)[:10]), "metric": metric, "value": count}
+            for d, count in conn.execute(select(day, func.count()).group_by(day))
+            if d is not None
+        ]
+        if rows:
+            conn.execute(DailyStat.__table__.insert(), rows)
+
+
+def counters(metric):
+    """Return ``[(key, count), ...]`` for ``metric``, largest first."""
+    rows = (
+        StatCounter.query.filter_by(metric=metric)
+        .filter(StatCounter.value > 0)
+        .order_by(StatCounter.value.desc())
+        .all()
+    )
+    return [(row.key, row.value) for row in rows]
+
+
+def daily_series(metric, days=14):
+    """Return ``[(date, count), ...]`` for the last ``days`` days, zero-filled."""
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    rows = DailyStat.query.filter(DailyStat.metric == metric, DailyStat.day >= start).all()
+    by_day = {row.day: row.value for row in rows}
+    return [(start + timedelta(days=i), by_day.get(start + timedelta(days=i), 0)) for i in range(days)]
@@ -0,0 +1,111 @@
+"""Per-process cache of the user fields Flask-Login needs on every request.
+
+``load_user`` returns a :class:`UserSnapshot` (id, role, name,
+preferred_language) from an LRU cache with a TTL instead of querying the
+``user`` table each time. Entries are dropped by ``after_update`` and
+``after_delete`` events on :class:`~bluehire.models.User` in this process;
+other processes pick up changes when their entry expires after
+``USER_CACHE_TTL`` seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event
+
+from bluehire import db
+from bluehire.models import User
+
+DEFAULTS = {
+    "USER_CACHE_SIZE": 10000,
+    "USER_CACHE_TTL": 300,
+}
+
+
+class UserSnapshot(UserMixin):
+    __slots__ = ("id", "role", "name", "preferred_language")
+
+    def __init__(self, id, role, name, preferred_language):
+        self.id = id
+        self.role = role
+        self.name = name
+        self.preferred_language = preferred_language
+
+
+class UserCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        row = db.session.execute(
+            db.select(User.id, User.role, User.name, User.preferred_language).where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+        snapshot = UserSnapshot(*row)
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.extensions["user_cache"] = UserCache(app.config["USER_CACHE_SIZE"], app.config["USER_CACHE_TTL"])
+
+
+def get_cache():
+    return current_app.extensions["user_cache"]
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, user):
+    try:
+        cache = current_app.extensions.get("user_cache")
+    except RuntimeError:
+        return
+    if cache is not None:
+        cache.invalidate(user.id)
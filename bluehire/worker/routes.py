@@ -1,8 +1,9 @@
 from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
+from sqlalchemy.exc import IntegrityError
 
-from bluehire import db
-from bluehire.models import WorkerProfile, Job, Application
+from bluehire import db, listing, matching, notifications, ratelimit, replicas
+from bluehire.models import EmployerProfile, WorkerProfile, Job, Application
 from . import worker_bp
 
 
@@ -19,15 +20,42 @@ def worker_required(func):
     return wrapper
 
 
+def dashboard_applications_query(worker_id):
+    """A worker's applications, newest first, as one joined query of plain rows.
+
+    Read in ``ix_application_worker_applied_at`` order; no per-application
+    lazy loads.
+    """
+    return (
+        db.select(
+            Application.job_id,
+            Application.status,
+            Application.applied_at,
+            Job.title,
+            Job.location,
+            EmployerProfile.company_name,
+        )
+        .join(Job, Application.job_id == Job.id)
+        .join(EmployerProfile, Job.employer_id == EmployerProfile.id)
+        .where(Application.worker_id == worker_id)
+        .order_by(Application.applied_at.desc())
+    )
+
+
 @worker_bp.route("/dashboard")
+@replicas.read_only
 @login_required
 @worker_required
 def dashboard():
     profile = WorkerProfile.query.filter_by(user_id=current_user.id).first()
     applications = []
+    recommended = []
     if profile:
-        applications = Application.query.filter_by(worker_id=profile.id).all()
-    return render_template("worker_dashboard.html", profile=profile, applications=applications)
+        applications = db.session.execute(dashboard_applications_query(profile.id)).all()
+        recommended = matching.recommend_jobs(profile, exclude={app.job_id for app in applications})
+    return render_template(
+        "worker_dashboard.html", profile=profile, applications=applications, recommended=recommended
+    )
 
 
 @worker_bp.route("/profile", methods=["GET", "POST"])
@@ -59,27 +87,18 @@ def profile():
 
 
 @worker_bp.route("/jobs")
+@replicas.read_only
 @login_required
 @worker_required
 def browse_jobs():
-    q = request.args.get("q", "")
-    location = request.args.get("location", "")
-    category = request.args.get("category", "")
-
-    jobs_query = Job.query
-    if q:
-        like = f"%{q}%"
-        jobs_query = jobs_query.filter(Job.title.ilike(like) | Job.skills_required.ilike(like))
-    if location:
-        jobs_query = jobs_query.filter(Job.location.ilike(f"%{location}%"))
-    if category:
-        jobs_query = jobs_query.filter(Job.category.ilike(f"%{category}%"))
-
-    jobs = jobs_query.order_by(Job.created_at.desc()).all()
-    return render_template("worker_jobs.html", jobs=jobs, q=q, location=location, category=category)
+    filters = listing.JobFilters.from_args(request.args)
+    page = filters.page(request.args.get("cursor"))
+    return render_template("worker_jobs.html", jobs=page.items, page=page, filters=filters)
 
 
 @worker_bp.route("/jobs/<int:job_id>/apply", methods=["POST"])
+# Before login_required: the user id comes from the session, not the database.
+@ratelimit.limit("apply_job", account=ratelimit.session_value("_user_id"))
 @login_required
 @worker_required
 def apply_job(job_id):
@@ -89,18 +108,23 @@ def apply_job(job_id):
         return redirect(url_for("worker.profile"))
 
     job = Job.query.get_or_404(job_id)
-
-    existing = Application.query.filter_by(worker_id=profile.id, job_id=job.id).first()
-    if existing:
-        flash("You have already applied for this job.", "info")
+    if job.status != "open":
+        flash("This job is no longer accepting applications.", "info")
         return redirect(url_for("worker.browse_jobs"))
 
+    # Load the recipient before adding rows, so autoflush cannot raise early.
+    employer_user = job.employer.user
+
+    # uq_application_worker_job rejects duplicates, so no pre-check query.
     application = Application(worker_id=profile.id, job_id=job.id)
     db.session.add(application)
-    db.session.commit()
-
-    # Simple notification stub – replace with SMS or email integration
-    print(f"[NOTIFY] New application: worker_profile={profile.id} job={job.title}")
+    notifications.enqueue(employer_user, "new_application", f"{current_user.name} applied for {job.title}.")
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        flash("You have already applied for this job.", "info")
+        return redirect(url_for("worker.browse_jobs"))
 
     flash("Applied successfully.", "success")
     return redirect(url_for("worker.dashboard"))
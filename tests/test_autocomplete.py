@@ -0,0 +1,46 @@
+"""Rebuilds of the per-process autocomplete index."""
+import threading
+import time
+
+import pytest
+
+from bluehire import autocomplete, create_app, db, migrations
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'autocomplete.db'}", "TESTING": True})
+    with app.app_context():
+        migrations.upgrade(db.engine)
+    return app
+
+
+def test_concurrent_rebuilds_load_once(app):
+    index = app.extensions["autocomplete"]
+    index.loaded_at = time.monotonic() - app.config["AUTOCOMPLETE_REBUILD_INTERVAL"] - 1
+    calls = []
+    real_load = index.load
+
+    def slow_load(conn):
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        real_load(conn)
+
+    index.load = slow_load
+    barrier = threading.Barrier(2)
+    results = []
+
+    def request():
+        with app.app_context():
+            barrier.wait()
+            results.append(autocomplete.complete("city", "mum"))
+            db.session.remove()
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 2
@@ -0,0 +1,49 @@
+"""Bulk job import through the employer page."""
+import io
+
+import pytest
+
+from bluehire import create_app, db, migrations
+from bluehire.models import EmployerProfile, Job, User
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'import.db'}",
+        "TESTING": True,
+        "PAGE_CACHE_BACKEND": "none",
+        "RATELIMIT_BACKEND": "none",
+        "PASSWORD_FAST_HASH": True,
+        "JOB_IMPORT_BATCH_SIZE": 2,
+    })
+    with app.app_context():
+        migrations.upgrade(db.engine)
+        user = User(name="Metro Constructions", email="metro@bluehire.test", role="employer")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(EmployerProfile(user_id=user.id, company_name="Metro Constructions", location="Mumbai"))
+        db.session.commit()
+    return app
+
+
+def test_csv_error_partway_reports_saved_jobs(app):
+    rows = ["title,description,category,location"]
+    rows += [f"Mason {n},Brick work,Construction,Mumbai" for n in range(5)]
+    rows.append("Painter," + "x" * 200_000 + ",Painting,Mumbai")
+    client = app.test_client()
+    client.post("/login", data={"email": "metro@bluehire.test", "password": "password123"})
+
+    response = client.post(
+        "/employer/jobs/import",
+        data={"file": (io.BytesIO("\n".join(rows).encode()), "jobs.csv")},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert "Imported 5 new and 0 updated jobs; 1 rows had errors." in page
+    assert "field larger than field limit" in page
+    with app.app_context():
+        assert Job.query.count() == 5
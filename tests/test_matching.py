@@ -0,0 +1,56 @@
+"""Reloads of the per-process match index."""
+import threading
+import time
+
+import pytest
+
+from bluehire import create_app, db, matching, migrations
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'matching.db'}", "TESTING": True})
+    with app.app_context():
+        migrations.upgrade(db.engine)
+    return app
+
+
+def _concurrent_get_index(app, count=2):
+    barrier = threading.Barrier(count)
+
+    def request():
+        with app.app_context():
+            barrier.wait()
+            matching.get_index()
+            db.session.remove()
+
+    threads = [threading.Thread(target=request) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _slow_load(index, calls):
+    real_load = index.load
+
+    def load(conn):
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        real_load(conn)
+
+    return load
+
+
+@pytest.mark.parametrize("loaded", [False, True], ids=["first load", "stale reload"])
+def test_concurrent_reloads_load_once(app, loaded):
+    index = app.extensions["matching"]
+    if loaded:
+        index.loaded_at = time.monotonic() - app.config["MATCHING_RELOAD_INTERVAL"] - 1
+    calls = []
+    index.load = _slow_load(index, calls)
+
+    _concurrent_get_index(app)
+
+    assert len(calls) == 1
+    assert index.loaded_at is not None
@@ -0,0 +1,112 @@
+"""EXPLAIN QUERY PLAN over the statements the hot routes actually execute.
+
+Each route is requested once to warm the per-process caches (gazetteer,
+matching and autocomplete indexes load whole tables on purpose), then
+again while every SELECT sent to SQLite is recorded and explained.
+"""
+import pytest
+from sqlalchemy import event
+
+from bluehire import create_app, db, loadgen, migrations, query_plans
+from bluehire.models import Application, Job, User, WorkerProfile
+
+# Statements allowed to sort wherever they run: FTS5 ranks its matches.
+MAY_SORT = ("bm25(",)
+
+# (query arguments, may sort): the combinations bluehire.listing documents
+# as sorting their matching rows.
+LISTINGS = [
+    ({}, False),
+    ({"q": "electrician"}, False),
+    ({"q": "electrician", "sort": "newest"}, True),
+    ({"location": "Delhi"}, False),
+    ({"location": "Delhi", "radius": "100"}, True),
+    ({"location": "Delhi", "min_salary": "20000"}, True),
+    ({"location": "Delhi", "sort": "salary"}, False),
+    ({"location": "Delhi", "sort": "salary", "min_salary": "20000"}, False),
+    ({"min_salary": "20000"}, False),
+    ({"sort": "salary", "min_salary": "20000"}, False),
+    ({"posted_within": "7"}, False),
+    ({"location": "Delhi", "posted_within": "7"}, False),
+]
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    path = tmp_path_factory.mktemp("plans") / "plans.db"
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "TESTING": True,
+            "PAGE_CACHE_BACKEND": "none",
+            "RATELIMIT_BACKEND": "none",
+            "PASSWORD_HASH_WORKERS": 0,
+        }
+    )
+    with app.app_context():
+        migrations.upgrade(db.engine)
+        loadgen.generate(db.engine, 5, 50, 200, 300, report=lambda *args: None)
+    return app
+
+
+def _login(app, email):
+    client = app.test_client()
+    response = client.post("/login", data={"email": email, "password": loadgen.PASSWORD})
+    assert response.status_code == 302
+    return client
+
+
+def _cases(app):
+    with app.app_context():
+        worker_email = db.session.execute(
+            db.select(User.email)
+            .select_from(WorkerProfile)
+            .join(User, WorkerProfile.user_id == User.id)
+            .join(Application, Application.worker_id == WorkerProfile.id)
+            .limit(1)
+        ).scalar_one()
+        job_id, employer_email = db.session.execute(
+            db.select(Job.id, User.email).join(Job.employer).join(User).limit(1)
+        ).one()
+    anonymous = app.test_client()
+    worker = _login(app, worker_email)
+    employer = _login(app, employer_email)
+    cases = [(anonymous, "/", args, may_sort) for args, may_sort in LISTINGS]
+    cases += [(worker, "/worker/jobs", args, may_sort) for args, may_sort in LISTINGS]
+    cases += [
+        (worker, "/worker/dashboard", {}, False),
+        # An employer's few jobs are sorted after grouping.
+        (employer, "/employer/dashboard", {}, True),
+        (employer, f"/employer/jobs/{job_id}/applications", {}, False),
+    ]
+    return cases
+
+
+def test_hot_routes_use_indexes(app):
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            recorded.append((statement, parameters))
+
+    for client, path, args, _ in _cases(app):
+        assert client.get(path, query_string=args).status_code == 200
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        failures = []
+        for client, path, args, may_sort in _cases(app):
+            del recorded[:]
+            assert client.get(path, query_string=args).status_code == 200
+            with engine.connect() as conn:
+                for statement, parameters in recorded:
+                    plan = query_plans.explain(conn, statement, parameters)
+                    if query_plans.is_bad(plan, may_sort or any(part in statement for part in MAY_SORT)):
+                        failures.append((path, args, statement, plan))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert not failures, "\n\n".join(
+        f"{path} {args}:\n{statement}\n  " + "\n  ".join(plan) for path, args, statement, plan in failures
+    )